@@ -5,7 +5,7 @@ import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
 from app.database import Base
-from app.models import notice, user
+from app.models import notice, user, attachment, revision, audit, digest, webhook
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,50 @@
+"""Initial schema: users and notices.
+
+Revision ID: 0001
+Revises:
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("uid", sa.String(128), primary_key=True),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("role", sa.String(50)),
+        sa.Column("department", sa.String(100), nullable=True),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("last_login", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "notices",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("category", sa.String(50), nullable=False),
+        sa.Column("subcategory", sa.String(100)),
+        sa.Column("author_uid", sa.String(128), nullable=False),
+        sa.Column("author_name", sa.String(255), nullable=False),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("priority", sa.Integer()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_notices_id", "notices", ["id"])
+    op.create_index("ix_notices_title", "notices", ["title"])
+    op.create_index("ix_notices_category", "notices", ["category"])
+    op.create_index("ix_notices_subcategory", "notices", ["subcategory"])
+
+def downgrade():
+    op.drop_table("notices")
+    op.drop_table("users")
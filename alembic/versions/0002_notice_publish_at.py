@@ -0,0 +1,28 @@
+"""Scheduled publishing: notices.publish_at and notices.is_published.
+
+Revision ID: 0002
+Revises: 0001
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column("notices", sa.Column("publish_at", sa.DateTime(timezone=True), nullable=True))
+    # Existing notices are already on the board
+    op.add_column(
+        "notices",
+        sa.Column("is_published", sa.Boolean(), nullable=False, server_default=sa.true()),
+    )
+    op.create_index("ix_notices_publish_at", "notices", ["publish_at"])
+    op.create_index("ix_notices_is_published", "notices", ["is_published"])
+
+def downgrade():
+    op.drop_index("ix_notices_is_published", table_name="notices")
+    op.drop_index("ix_notices_publish_at", table_name="notices")
+    op.drop_column("notices", "is_published")
+    op.drop_column("notices", "publish_at")
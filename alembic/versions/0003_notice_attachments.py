@@ -0,0 +1,31 @@
+"""Notice attachments table.
+
+Revision ID: 0003
+Revises: 0002
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "notice_attachments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("notice_id", sa.Integer(), sa.ForeignKey("notices.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("sha256", sa.String(64), nullable=False),
+        sa.Column("filename", sa.String(255), nullable=False),
+        sa.Column("content_type", sa.String(100), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("uploaded_by", sa.String(128), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_notice_attachments_id", "notice_attachments", ["id"])
+    op.create_index("ix_notice_attachments_notice_id", "notice_attachments", ["notice_id"])
+    op.create_index("ix_notice_attachments_sha256", "notice_attachments", ["sha256"])
+
+def downgrade():
+    op.drop_table("notice_attachments")
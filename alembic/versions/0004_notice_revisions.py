@@ -0,0 +1,30 @@
+"""Notice revision history.
+
+Revision ID: 0004
+Revises: 0003
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column("notices", sa.Column("revision", sa.Integer(), nullable=False, server_default="1"))
+    op.create_table(
+        "notice_revisions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("notice_id", sa.Integer(), sa.ForeignKey("notices.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("revision", sa.Integer(), nullable=False),
+        sa.Column("is_snapshot", sa.Boolean(), nullable=False),
+        sa.Column("data", sa.Text(), nullable=False),
+        sa.Column("superseded_by", sa.String(128), nullable=False),
+        sa.Column("superseded_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("notice_id", "revision", name="uq_notice_revisions_notice_revision"),
+    )
+
+def downgrade():
+    op.drop_table("notice_revisions")
+    op.drop_column("notices", "revision")
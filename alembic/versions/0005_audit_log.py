@@ -0,0 +1,31 @@
+"""Audit log for admin actions.
+
+Revision ID: 0005
+Revises: 0004
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "audit_log",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("actor_uid", sa.String(128), nullable=False),
+        sa.Column("action", sa.String(50), nullable=False),
+        sa.Column("target_type", sa.String(50), nullable=False),
+        sa.Column("target_id", sa.String(128), nullable=False),
+        sa.Column("details", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_audit_log_actor_id", "audit_log", ["actor_uid", "id"])
+    op.create_index("ix_audit_log_action_id", "audit_log", ["action", "id"])
+    op.create_index("ix_audit_log_target_id", "audit_log", ["target_type", "target_id", "id"])
+    op.create_index("ix_audit_log_created_at", "audit_log", ["created_at"])
+
+def downgrade():
+    op.drop_table("audit_log")
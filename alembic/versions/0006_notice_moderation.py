@@ -0,0 +1,30 @@
+"""Notice moderation: approval columns and the pending-queue partial index.
+
+Revision ID: 0006
+Revises: 0005
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Everything already on the board counts as approved
+    op.add_column("notices", sa.Column("is_approved", sa.Boolean(), nullable=True, server_default=sa.true()))
+    op.add_column("notices", sa.Column("approved_by", sa.String(128), nullable=True))
+    op.add_column("notices", sa.Column("approved_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("notices", sa.Column("rejection_reason", sa.Text(), nullable=True))
+    op.create_index(
+        "ix_notices_pending", "notices", ["created_at", "id"],
+        postgresql_where=sa.text("is_approved IS NULL"),
+    )
+
+def downgrade():
+    op.drop_index("ix_notices_pending", table_name="notices")
+    op.drop_column("notices", "rejection_reason")
+    op.drop_column("notices", "approved_at")
+    op.drop_column("notices", "approved_by")
+    op.drop_column("notices", "is_approved")
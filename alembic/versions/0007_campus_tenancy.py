@@ -0,0 +1,74 @@
+"""Multi-campus tenancy: campus columns and campus-led indexes.
+
+Revision ID: 0007
+Revises: 0006
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# Existing rows all belong to the single campus the deployment served so far
+DEFAULT_CAMPUS = "main"
+
+AUDIT_INDEXES = {
+    "ix_audit_log_actor_id": ["actor_uid", "id"],
+    "ix_audit_log_action_id": ["action", "id"],
+    "ix_audit_log_target_id": ["target_type", "target_id", "id"],
+    "ix_audit_log_created_at": ["created_at"],
+}
+
+CAMPUS_AUDIT_INDEXES = {
+    "ix_audit_log_campus_id": ["campus", "id"],
+    "ix_audit_log_campus_actor_id": ["campus", "actor_uid", "id"],
+    "ix_audit_log_campus_action_id": ["campus", "action", "id"],
+    "ix_audit_log_campus_target_id": ["campus", "target_type", "target_id", "id"],
+    "ix_audit_log_campus_created_at": ["campus", "created_at"],
+}
+
+def upgrade():
+    for table in ("notices", "users", "audit_log"):
+        op.add_column(
+            table, sa.Column("campus", sa.String(50), nullable=False, server_default=DEFAULT_CAMPUS)
+        )
+
+    op.drop_index("ix_notices_category", table_name="notices")
+    op.drop_index("ix_notices_subcategory", table_name="notices")
+    op.drop_index("ix_notices_pending", table_name="notices")
+    op.create_index("ix_notices_campus_feed", "notices", ["campus", "category", "priority", "created_at"])
+    op.create_index("ix_notices_campus_subcategory", "notices", ["campus", "subcategory"])
+    op.create_index(
+        "ix_notices_campus_pending", "notices", ["campus", "created_at", "id"],
+        postgresql_where=sa.text("is_approved IS NULL"),
+    )
+
+    op.create_index("ix_users_campus_department", "users", ["campus", "department"])
+
+    for name in AUDIT_INDEXES:
+        op.drop_index(name, table_name="audit_log")
+    for name, columns in CAMPUS_AUDIT_INDEXES.items():
+        op.create_index(name, "audit_log", columns)
+
+def downgrade():
+    for name in CAMPUS_AUDIT_INDEXES:
+        op.drop_index(name, table_name="audit_log")
+    for name, columns in AUDIT_INDEXES.items():
+        op.create_index(name, "audit_log", columns)
+
+    op.drop_index("ix_users_campus_department", table_name="users")
+
+    op.drop_index("ix_notices_campus_pending", table_name="notices")
+    op.drop_index("ix_notices_campus_subcategory", table_name="notices")
+    op.drop_index("ix_notices_campus_feed", table_name="notices")
+    op.create_index(
+        "ix_notices_pending", "notices", ["created_at", "id"],
+        postgresql_where=sa.text("is_approved IS NULL"),
+    )
+    op.create_index("ix_notices_subcategory", "notices", ["subcategory"])
+    op.create_index("ix_notices_category", "notices", ["category"])
+
+    for table in ("audit_log", "users", "notices"):
+        op.drop_column(table, "campus")
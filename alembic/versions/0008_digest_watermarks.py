@@ -0,0 +1,30 @@
+"""Department digest watermarks.
+
+Revision ID: 0008
+Revises: 0007
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "digest_watermarks",
+        sa.Column("campus", sa.String(50), primary_key=True),
+        sa.Column("department", sa.String(100), primary_key=True),
+        sa.Column("watermark", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_run_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_notice_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_recipient_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    # Digest runs look up notices approved or published since a watermark;
+    # publish_at already has its own index
+    op.create_index("ix_notices_campus_approved_at", "notices", ["campus", "approved_at"])
+
+def downgrade():
+    op.drop_index("ix_notices_campus_approved_at", table_name="notices")
+    op.drop_table("digest_watermarks")
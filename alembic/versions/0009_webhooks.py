@@ -0,0 +1,51 @@
+"""Outbound webhook subscriptions and their delivery queue.
+
+Revision ID: 0009
+Revises: 0008
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "webhook_subscriptions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("campus", sa.String(50), nullable=False),
+        sa.Column("url", sa.String(2048), nullable=False),
+        sa.Column("secret", sa.String(128), nullable=False),
+        sa.Column("events", sa.Text(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column("created_by", sa.String(128), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("last_delivery_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+    )
+    op.create_index("ix_webhook_subscriptions_campus", "webhook_subscriptions", ["campus"])
+    op.create_table(
+        "webhook_deliveries",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "subscription_id", sa.Integer(),
+            sa.ForeignKey("webhook_subscriptions.id", ondelete="CASCADE"), nullable=False
+        ),
+        sa.Column("event", sa.String(50), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_webhook_deliveries_due", "webhook_deliveries", ["next_attempt_at"],
+        postgresql_where=sa.text("next_attempt_at IS NOT NULL"),
+    )
+    op.create_index("ix_webhook_deliveries_subscription", "webhook_deliveries", ["subscription_id", "id"])
+
+def downgrade():
+    op.drop_table("webhook_deliveries")
+    op.drop_table("webhook_subscriptions")
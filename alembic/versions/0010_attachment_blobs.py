@@ -0,0 +1,27 @@
+"""Attachment blob reference counts.
+
+Revision ID: 0010
+Revises: 0009
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "attachment_blobs",
+        sa.Column("sha256", sa.String(64), primary_key=True),
+        sa.Column("ref_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.execute(
+        "INSERT INTO attachment_blobs (sha256, ref_count) "
+        "SELECT sha256, COUNT(*) FROM notice_attachments GROUP BY sha256"
+    )
+
+def downgrade():
+    op.drop_table("attachment_blobs")
@@ -1,54 +1,54 @@
-# admin.py - Add this to your app/api/ directory
-
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import desc, or_, tuple_, update
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from ..database import get_db
 from ..models.user import User
 from ..models.notice import Notice
-from ..schemas.user import UserResponse, UserCreate, UserUpdate, AdminUserResponse
-from ..schemas.notice import NoticeResponse
-from ..core.security import get_current_user, require_admin
+from ..schemas.user import User as UserSchema
+from ..schemas.notice import (
+    Notice as NoticeSchema, ModerationRequest, ModerationResult, PendingNoticePage, RejectionRequest
+)
+from ..core.security import get_current_admin
+from ..core.audit import audit_log
+from ..core.feed import feed_state
+from ..core.scheduler import notice_scheduler
+from ..core.webhooks import webhook_dispatcher
+from ..utils.helpers import as_utc, utcnow
+from .notices import delete_notice
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
-# Admin-only decorator
-def admin_required(current_user: User = Depends(get_current_user)):
-    if current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Admin access required"
-        )
-    return current_user
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
 
 # User Management Routes
-@router.get("/users", response_model=List[AdminUserResponse])
+@router.get("/users", response_model=List[UserSchema])
 async def get_all_users(
     skip: int = 0,
     limit: int = 100,
     role: Optional[str] = None,
     db: Session = Depends(get_db),
-    admin_user: User = Depends(admin_required)
+    admin_user: User = Depends(get_current_admin)
 ):
-    """Get all users (admin only)"""
-    query = db.query(User)
-    
+    """Get all users on the admin's campus (admin only)"""
+    query = db.query(User).filter(User.campus == admin_user.campus)
+
     if role:
         query = query.filter(User.role == role)
-    
-    users = query.offset(skip).limit(limit).all()
+
+    users = query.order_by(User.created_at).offset(skip).limit(limit).all()
     return users
 
-@router.get("/users/{user_id}", response_model=AdminUserResponse)
-async def get_user_by_id(
-    user_id: int,
+@router.get("/users/{user_uid}", response_model=UserSchema)
+async def get_user_by_uid(
+    user_uid: str,
     db: Session = Depends(get_db),
-    admin_user: User = Depends(admin_required)
+    admin_user: User = Depends(get_current_admin)
 ):
-    """Get specific user by ID (admin only)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    """Get specific user by uid (admin only)"""
+    user = db.query(User).filter(User.uid == user_uid, User.campus == admin_user.campus).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -56,12 +56,12 @@ async def get_user_by_id(
         )
     return user
 
-@router.put("/users/{user_id}/role")
+@router.put("/users/{user_uid}/role")
 async def update_user_role(
-    user_id: int,
+    user_uid: str,
     new_role: str,
     db: Session = Depends(get_db),
-    admin_user: User = Depends(admin_required)
+    admin_user: User = Depends(get_current_admin)
 ):
     """Update user role (admin only)"""
     if new_role not in ["student", "faculty", "admin"]:
@@ -69,185 +69,234 @@ async def update_user_role(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid role. Must be 'student', 'faculty', or 'admin'"
         )
-    
-    user = db.query(User).filter(User.id == user_id).first()
+
+    user = db.query(User).filter(User.uid == user_uid, User.campus == admin_user.campus).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    
+
+    old_role = user.role
     user.role = new_role
-    user.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(user)
-    
-    return {"message": f"User role updated to {new_role}", "user": user}
 
-@router.delete("/users/{user_id}")
+    if old_role != new_role:
+        await audit_log.record(
+            admin_user, "user.role_change", "user", user.uid, {"from": old_role, "to": new_role}
+        )
+    return {"message": f"User role updated to {new_role}", "user": UserSchema.model_validate(user)}
+
+@router.delete("/users/{user_uid}")
 async def delete_user(
-    user_id: int,
+    user_uid: str,
     db: Session = Depends(get_db),
-    admin_user: User = Depends(admin_required)
+    admin_user: User = Depends(get_current_admin)
 ):
     """Delete user (admin only)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.query(User).filter(User.uid == user_uid, User.campus == admin_user.campus).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    
+
     if user.role == "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Cannot delete admin users"
         )
-    
+
     db.delete(user)
     db.commit()
-    
+    await audit_log.record(admin_user, "user.delete", "user", user_uid, {"email": user.email})
+
     return {"message": "User deleted successfully"}
 
 # Notice Management Routes
-@router.get("/notices", response_model=List[NoticeResponse])
+@router.get("/notices", response_model=List[NoticeSchema])
 async def get_all_notices_admin(
     skip: int = 0,
     limit: int = 100,
     include_expired: bool = True,
     db: Session = Depends(get_db),
-    admin_user: User = Depends(admin_required)
+    admin_user: User = Depends(get_current_admin)
 ):
     """Get all notices including expired ones (admin only)"""
-    query = db.query(Notice)
-    
+    query = db.query(Notice).filter(Notice.campus == admin_user.campus)
+
     if not include_expired:
-        query = query.filter(Notice.expires_at > datetime.utcnow())
-    
-    notices = query.offset(skip).limit(limit).all()
+        query = query.filter(or_(Notice.expires_at.is_(None), Notice.expires_at > utcnow()))
+
+    notices = query.order_by(desc(Notice.created_at)).offset(skip).limit(limit).all()
     return notices
 
-@router.put("/notices/{notice_id}/approve")
-async def approve_notice(
-    notice_id: int,
+@router.get("/notices/pending", response_model=PendingNoticePage)
+async def get_pending_notices(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
     db: Session = Depends(get_db),
-    admin_user: User = Depends(admin_required)
+    admin_user: User = Depends(get_current_admin)
 ):
-    """Approve a pending notice (admin only)"""
-    notice = db.query(Notice).filter(Notice.id == notice_id).first()
+    """Moderation queue, oldest submission first (admin only)"""
+    query = db.query(Notice).filter(Notice.campus == admin_user.campus, Notice.is_approved.is_(None))
+
+    # Keyset pagination over (created_at, id), served by the campus pending index
+    if cursor:
+        try:
+            micros, notice_id = (int(part) for part in cursor.split("-"))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        after = (EPOCH + timedelta(microseconds=micros), notice_id)
+        query = query.filter(tuple_(Notice.created_at, Notice.id) > after)
+
+    notices = query.order_by(Notice.created_at, Notice.id).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(notices) > limit:
+        notices = notices[:limit]
+        last = notices[-1]
+        # URL-safe cursor: creation time in integer microseconds, then id
+        micros = (as_utc(last.created_at) - EPOCH) // timedelta(microseconds=1)
+        next_cursor = f"{micros}-{last.id}"
+
+    return PendingNoticePage(notices=notices, next_cursor=next_cursor)
+
+async def _moderate(
+    db: Session,
+    admin_user: User,
+    notice_ids: List[int],
+    approve: bool,
+    reason: Optional[str] = None
+) -> List[int]:
+    """Approve or reject pending notices in one UPDATE ... RETURNING statement."""
+    now = utcnow()
+    values = {"is_approved": approve, "approved_by": admin_user.uid, "approved_at": now}
+    values["rejection_reason"] = None if approve else reason
+
+    notices = db.scalars(
+        update(Notice)
+        .where(Notice.id.in_(notice_ids), Notice.campus == admin_user.campus, Notice.is_approved.is_(None))
+        .values(**values)
+        .returning(Notice),
+        execution_options={"synchronize_session": False}
+    ).all()
+    # Detach the RETURNING rows so commit doesn't expire them into N refreshes
+    for notice in notices:
+        db.expunge(notice)
+    db.commit()
+
+    action = "notice.approve" if approve else "notice.reject"
+    for notice in notices:
+        if approve:
+            notice_scheduler.schedule_notice(notice)
+            feed_state.notice_changed(notice)
+        await audit_log.record(admin_user, action, "notice", notice.id, {"reason": reason} if reason else None)
+        # Pending notices were never on the board; approval may put them there
+        await webhook_dispatcher.visibility_event(notice, was_visible=False)
+    return [notice.id for notice in notices]
+
+def _require_pending(db: Session, notice_id: int, campus: str) -> None:
+    """Explain why a single-notice moderation call updated nothing."""
+    notice = db.query(Notice.id).filter(Notice.id == notice_id, Notice.campus == campus).first()
     if not notice:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Notice not found"
         )
-    
-    notice.is_approved = True
-    notice.approved_by = admin_user.id
-    notice.approved_at = datetime.utcnow()
-    notice.updated_at = datetime.utcnow()
-    
-    db.commit()
-    db.refresh(notice)
-    
-    return {"message": "Notice approved successfully", "notice": notice}
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Notice is not pending review"
+    )
 
-@router.put("/notices/{notice_id}/reject")
+@router.put("/notices/{notice_id}/approve", response_model=NoticeSchema)
+async def approve_notice(
+    notice_id: int,
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_admin)
+):
+    """Approve a pending notice (admin only)"""
+    if not await _moderate(db, admin_user, [notice_id], approve=True):
+        _require_pending(db, notice_id, admin_user.campus)
+    return db.get(Notice, notice_id)
+
+@router.put("/notices/{notice_id}/reject", response_model=NoticeSchema)
 async def reject_notice(
     notice_id: int,
     reason: str,
     db: Session = Depends(get_db),
-    admin_user: User = Depends(admin_required)
+    admin_user: User = Depends(get_current_admin)
 ):
     """Reject a pending notice (admin only)"""
-    notice = db.query(Notice).filter(Notice.id == notice_id).first()
-    if not notice:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Notice not found"
-        )
-    
-    notice.is_approved = False
-    notice.rejection_reason = reason
-    notice.updated_at = datetime.utcnow()
-    
-    db.commit()
-    db.refresh(notice)
-    
-    return {"message": "Notice rejected successfully", "notice": notice}
+    if not await _moderate(db, admin_user, [notice_id], approve=False, reason=reason):
+        _require_pending(db, notice_id, admin_user.campus)
+    return db.get(Notice, notice_id)
 
 @router.delete("/notices/{notice_id}")
 async def delete_notice_admin(
     notice_id: int,
     db: Session = Depends(get_db),
-    admin_user: User = Depends(admin_required)
+    admin_user: User = Depends(get_current_admin)
 ):
     """Delete any notice (admin only)"""
-    notice = db.query(Notice).filter(Notice.id == notice_id).first()
-    if not notice:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Notice not found"
-        )
-    
-    db.delete(notice)
-    db.commit()
-    
-    return {"message": "Notice deleted successfully"}
+    return await delete_notice(notice_id, db, admin_user)
 
 # System Statistics
 @router.get("/stats")
 async def get_system_stats(
     db: Session = Depends(get_db),
-    admin_user: User = Depends(admin_required)
+    admin_user: User = Depends(get_current_admin)
 ):
-    """Get system statistics (admin only)"""
-    total_users = db.query(User).count()
-    total_notices = db.query(Notice).count()
-    pending_notices = db.query(Notice).filter(Notice.is_approved == None).count()
-    approved_notices = db.query(Notice).filter(Notice.is_approved == True).count()
-    
+    """Get statistics for the admin's campus (admin only)"""
+    users = db.query(User).filter(User.campus == admin_user.campus)
+    notices = db.query(Notice).filter(Notice.campus == admin_user.campus)
+    total_users = users.count()
+    total_notices = notices.count()
+    pending_notices = notices.filter(Notice.is_approved.is_(None)).count()
+    approved_notices = notices.filter(Notice.is_approved == True).count()
+    rejected_notices = notices.filter(Notice.is_approved == False).count()
+
     users_by_role = {}
     for role in ["student", "faculty", "admin"]:
-        users_by_role[role] = db.query(User).filter(User.role == role).count()
-    
+        users_by_role[role] = users.filter(User.role == role).count()
+
     return {
         "total_users": total_users,
         "total_notices": total_notices,
         "pending_notices": pending_notices,
         "approved_notices": approved_notices,
+        "rejected_notices": rejected_notices,
         "users_by_role": users_by_role,
-        "generated_at": datetime.utcnow()
+        "campus": admin_user.campus,
+        "generated_at": utcnow()
     }
 
 # Bulk Operations
-@router.post("/notices/bulk-approve")
+@router.post("/notices/bulk-approve", response_model=ModerationResult)
 async def bulk_approve_notices(
-    notice_ids: List[int],
+    request: ModerationRequest,
     db: Session = Depends(get_db),
-    admin_user: User = Depends(admin_required)
+    admin_user: User = Depends(get_current_admin)
 ):
-    """Bulk approve multiple notices (admin only)"""
-    notices = db.query(Notice).filter(Notice.id.in_(notice_ids)).all()
-    
-    if not notices:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No notices found with provided IDs"
-        )
-    
-    approved_count = 0
-    for notice in notices:
-        if notice.is_approved is None:  # Only approve pending notices
-            notice.is_approved = True
-            notice.approved_by = admin_user.id
-            notice.approved_at = datetime.utcnow()
-            notice.updated_at = datetime.utcnow()
-            approved_count += 1
-    
-    db.commit()
-    
-    return {
-        "message": f"Approved {approved_count} notices",
-        "approved_count": approved_count,
-        "total_requested": len(notice_ids)
-    }
+    """Bulk approve multiple pending notices (admin only)"""
+    approved_ids = await _moderate(db, admin_user, request.notice_ids, approve=True)
+    return ModerationResult(
+        message=f"Approved {len(approved_ids)} notices",
+        updated_ids=approved_ids,
+        total_requested=len(request.notice_ids)
+    )
+
+@router.post("/notices/bulk-reject", response_model=ModerationResult)
+async def bulk_reject_notices(
+    request: RejectionRequest,
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_admin)
+):
+    """Bulk reject multiple pending notices (admin only)"""
+    rejected_ids = await _moderate(db, admin_user, request.notice_ids, approve=False, reason=request.reason)
+    return ModerationResult(
+        message=f"Rejected {len(rejected_ids)} notices",
+        updated_ids=rejected_ids,
+        total_requested=len(request.notice_ids)
+    )
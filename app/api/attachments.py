@@ -0,0 +1,130 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from ..config import settings
+from ..database import get_db
+from ..models.attachment import NoticeAttachment
+from ..models.user import User
+from ..schemas.attachment import Attachment as AttachmentSchema
+from ..core.security import get_current_admin, get_current_user_optional
+from ..core.storage import BlobResponse, attachment_storage, parse_range
+from ..core.tenancy import CAMPUS_HEADER, get_request_campus
+from ..utils.helpers import etag_matches
+from .notices import claim_blob, get_campus_notice, get_visible_notice, release_blobs
+
+router = APIRouter()
+
+# The upload body is parsed by hand, so describe it for the API docs
+UPLOAD_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
+
+def _get_attachment(db: Session, notice_id: int, attachment_id: int) -> NoticeAttachment:
+    attachment = db.query(NoticeAttachment).filter(
+        NoticeAttachment.id == attachment_id,
+        NoticeAttachment.notice_id == notice_id
+    ).first()
+    if not attachment:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    return attachment
+
+@router.post("/{notice_id}/attachments", response_model=AttachmentSchema, openapi_extra=UPLOAD_BODY)
+async def upload_attachment(
+    notice_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    notice = get_visible_notice(db, notice_id, current_user, current_user.campus)
+    
+    # Only read the body once the caller may upload here. The file is hashed
+    # into a staging file as it arrives instead of being spooled and copied
+    upload = await attachment_storage.receive(request)
+    staged = upload.blob
+    try:
+        claim_blob(db, staged)
+        attachment = NoticeAttachment(
+            notice_id=notice.id,
+            sha256=staged.sha256,
+            filename=upload.filename or staged.sha256,
+            content_type=upload.content_type or "application/octet-stream",
+            size=staged.size,
+            uploaded_by=current_user.uid
+        )
+        db.add(attachment)
+        db.commit()
+    finally:
+        attachment_storage.discard(staged)  # no-op once placed
+    db.refresh(attachment)
+    return attachment
+
+@router.get("/{notice_id}/attachments", response_model=list[AttachmentSchema])
+async def list_attachments(
+    notice_id: int,
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    campus: str = Depends(get_request_campus)
+):
+    get_visible_notice(db, notice_id, current_user, campus)
+    return db.query(NoticeAttachment).filter(
+        NoticeAttachment.notice_id == notice_id
+    ).order_by(NoticeAttachment.id).all()
+
+@router.get("/{notice_id}/attachments/{attachment_id}")
+async def download_attachment(
+    notice_id: int,
+    attachment_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    campus: str = Depends(get_request_campus)
+):
+    get_visible_notice(db, notice_id, current_user, campus)
+    attachment = _get_attachment(db, notice_id, attachment_id)
+    
+    # Blobs are content-addressed, so the hash is a strong validator
+    etag = f'"{attachment.sha256}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Vary": CAMPUS_HEADER})
+    
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if not if_range or if_range.strip() == etag:
+        byte_range = parse_range(request.headers.get("range"), attachment.size)
+    
+    return BlobResponse(
+        path=attachment_storage.path_for(attachment.sha256),
+        size=attachment.size,
+        byte_range=byte_range,
+        filename=attachment.filename,
+        media_type=attachment.content_type,
+        etag=etag,
+        chunk_size=settings.ATTACHMENT_CHUNK_SIZE,
+        vary=CAMPUS_HEADER
+    )
+
+@router.delete("/{notice_id}/attachments/{attachment_id}")
+async def delete_attachment(
+    notice_id: int,
+    attachment_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    get_campus_notice(db, notice_id, current_user.campus)
+    attachment = _get_attachment(db, notice_id, attachment_id)
+    db.delete(attachment)
+    release_blobs(db, [attachment.sha256])
+    db.commit()
+    return {"message": "Attachment deleted successfully"}
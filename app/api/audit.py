@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import desc
+from typing import Optional
+from datetime import datetime
+
+from ..database import get_db
+from ..models.audit import AuditEvent
+from ..models.user import User
+from ..schemas.audit import AuditEventPage
+from ..core.security import get_current_admin
+
+router = APIRouter()
+
+@router.get("/", response_model=AuditEventPage)
+async def get_audit_events(
+    actor_uid: Optional[str] = Query(None),
+    action: Optional[str] = Query(None),
+    target_type: Optional[str] = Query(None),
+    target_id: Optional[str] = Query(None),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    query = db.query(AuditEvent).filter(AuditEvent.campus == current_user.campus)
+    
+    if actor_uid:
+        query = query.filter(AuditEvent.actor_uid == actor_uid)
+    if action:
+        query = query.filter(AuditEvent.action == action)
+    if target_type:
+        query = query.filter(AuditEvent.target_type == target_type)
+    if target_id:
+        query = query.filter(AuditEvent.target_id == target_id)
+    if since:
+        query = query.filter(AuditEvent.created_at >= since)
+    if until:
+        query = query.filter(AuditEvent.created_at < until)
+    
+    # Keyset pagination: newest first, continue strictly below the last id seen
+    if cursor is not None:
+        query = query.filter(AuditEvent.id < cursor)
+    events = query.order_by(desc(AuditEvent.id)).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        next_cursor = events[-1].id
+    
+    return AuditEventPage(events=events, next_cursor=next_cursor)
@@ -5,6 +5,8 @@ from ..database import get_db
 from ..models.user import User
 from ..schemas.user import UserCreate, User as UserSchema
 from ..core.firebase import verify_firebase_token
+from ..core.tenancy import normalize_campus
+from ..config import settings
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 router = APIRouter()
@@ -30,7 +32,10 @@ async def register_user(
         name=decoded_token.get("name", decoded_token.get("email", "").split("@")[0])
     )
     
-    db_user = User(**user_data.dict())
+    db_user = User(
+        **user_data.dict(exclude={"campus"}),
+        campus=normalize_campus(decoded_token.get(settings.CAMPUS_CLAIM))
+    )
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
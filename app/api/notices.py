@@ -1,34 +1,132 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_, or_
+from sqlalchemy import desc, and_, or_, func, null
+from sqlalchemy.exc import IntegrityError
 from typing import Optional
 from datetime import datetime
+from collections import Counter
+import hashlib
 import math
 
-from ..database import get_db
+from ..database import get_db, SessionLocal
 from ..models.notice import Notice
 from ..models.user import User
-from ..schemas.notice import NoticeCreate, NoticeUpdate, Notice as NoticeSchema, NoticeList
-from ..core.security import get_current_user, get_current_admin, get_current_user_optional
+from ..models.attachment import AttachmentBlob, NoticeAttachment
+from ..models.revision import NoticeRevision
+from ..schemas.notice import (
+    NoticeCreate, NoticeUpdate, Notice as NoticeSchema, NoticeList,
+    NoticeRevision as NoticeRevisionSchema, NoticeRevisionInfo, NoticeSuggestion,
+    NoticeBatch, NoticeBatchRequest
+)
+from ..core.security import get_current_user, get_current_admin, get_current_author, get_current_user_optional
+from ..core.feed import feed_state
+from ..core.scheduler import notice_scheduler
+from ..core.audit import audit_log
+from ..core.singleflight import SingleFlight
+from ..core.suggest import suggest_index
+from ..core.hotset import hot_set
+from ..core.storage import StagedBlob, attachment_storage
+from ..core.revisions import build_revision, chain_bounds, reconstruct, snapshot_of
+from ..core.tenancy import CAMPUS_HEADER, get_request_campus
+from ..core.webhooks import webhook_dispatcher
+from ..config import settings
+from ..utils.helpers import as_utc, http_date, is_not_modified, utcnow
 
 router = APIRouter()
 
-@router.get("/", response_model=NoticeList)
-async def get_notices(
-    category: Optional[str] = Query(None, regex="^(main|club|department)$"),
-    subcategory: Optional[str] = Query(None),
-    search: Optional[str] = Query(None),
-    page: int = Query(1, ge=1),
-    per_page: int = Query(20, ge=1, le=100),
-    include_expired: bool = Query(False),
-    db: Session = Depends(get_db)
+# Identical concurrent feed reads share one database execution
+notice_page_flight = SingleFlight("notice_page")
+feed_token_flight = SingleFlight("feed_token")
+subcategory_flight = SingleFlight("subcategories")
+
+# Tries at creating a new blob row when concurrent uploads race on it
+BLOB_CLAIM_ATTEMPTS = 3
+
+def _visible_to(notice: Notice, current_user: Optional[User], now) -> bool:
+    # Expired, unapproved and not yet published notices are only shown to the
+    # notice's own campus admins
+    if current_user and current_user.role == "admin" and current_user.campus == notice.campus:
+        return True
+    return bool(notice.is_approved) and notice.is_published and not notice.is_expired(now)
+
+def get_visible_notice(db: Session, notice_id: int, current_user: Optional[User], campus: str) -> Notice:
+    notice = db.query(Notice).filter(Notice.id == notice_id, Notice.campus == campus).first()
+    if not notice or not _visible_to(notice, current_user, utcnow()):
+        raise HTTPException(status_code=404, detail="Notice not found")
+    return notice
+
+def get_campus_notice(db: Session, notice_id: int, campus: str, for_update: bool = False) -> Notice:
+    """Notice lookup for admin writes, scoped to the admin's campus."""
+    query = db.query(Notice).filter(Notice.id == notice_id, Notice.campus == campus)
+    if for_update:
+        query = query.with_for_update()
+    notice = query.first()
+    if not notice:
+        raise HTTPException(status_code=404, detail="Notice not found")
+    return notice
+
+def claim_blob(db: Session, staged: StagedBlob) -> None:
+    """Take a reference on a staged upload's blob and move it into the store.
+
+    The ref_count update (or the insert of a new row) keeps the blob row locked
+    until the caller commits, and release_blobs takes the same lock before
+    removing a file, so a reused blob can't be collected from under the upload.
+    """
+    for _ in range(BLOB_CLAIM_ATTEMPTS):
+        claimed = db.query(AttachmentBlob).filter(AttachmentBlob.sha256 == staged.sha256).update(
+            {"ref_count": AttachmentBlob.ref_count + 1}, synchronize_session=False
+        )
+        if not claimed:
+            db.add(AttachmentBlob(sha256=staged.sha256, ref_count=1))
+            try:
+                db.flush()
+            except IntegrityError:
+                # A concurrent upload created the row first; increment it instead
+                db.rollback()
+                continue
+        attachment_storage.place(staged)
+        return
+    raise HTTPException(status_code=409, detail="Attachment upload conflicted, please retry")
+
+def release_blobs(db: Session, blob_hashes: list[str]) -> None:
+    """Drop one reference per hash and remove blobs nothing points at any more.
+
+    Call before committing the deletion of the attachment rows: the blob rows
+    stay locked until then, so a concurrent upload of the same content waits
+    and places its own copy instead of reusing a file that is about to go.
+    """
+    if not blob_hashes:
+        return
+    # Lock in a fixed order so two deletes sharing blobs can't deadlock
+    for sha256, count in sorted(Counter(blob_hashes).items()):
+        db.query(AttachmentBlob).filter(AttachmentBlob.sha256 == sha256).update(
+            {"ref_count": AttachmentBlob.ref_count - count}, synchronize_session=False
+        )
+    unused = [row[0] for row in db.query(AttachmentBlob.sha256).filter(
+        AttachmentBlob.sha256.in_(set(blob_hashes)), AttachmentBlob.ref_count <= 0
+    ).all()]
+    if unused:
+        db.query(AttachmentBlob).filter(AttachmentBlob.sha256.in_(unused)).delete(synchronize_session=False)
+        for sha256 in unused:
+            attachment_storage.remove(sha256)
+
+def feed_query(
+    db: Session,
+    campus: str,
+    category: Optional[str],
+    subcategory: Optional[str],
+    search: Optional[str],
+    include_expired: bool
 ):
-    # This endpoint is now public - no authentication required
-    query = db.query(Notice).filter(Notice.is_active == True)
+    """Public feed filters shared by the listing and anything derived from it."""
+    query = db.query(Notice).filter(
+        Notice.campus == campus,
+        Notice.is_active == True, Notice.is_approved == True, Notice.is_published == True
+    )
     
     # Filter by expiration
     if not include_expired:
-        now = datetime.utcnow()
+        now = utcnow()
         query = query.filter(or_(Notice.expires_at.is_(None), Notice.expires_at > now))
     
     # Filter by category
@@ -47,55 +145,288 @@ async def get_notices(
         )
         query = query.filter(search_filter)
     
-    # Count total records
-    total = query.count()
+    return query
+
+def _load_notice_page(
+    campus: str,
+    category: Optional[str],
+    subcategory: Optional[str],
+    search: Optional[str],
+    include_expired: bool,
+    page: int,
+    per_page: int,
+    total: int
+) -> NoticeList:
+    # Runs in a worker thread on behalf of every coalesced caller, so it uses its
+    # own session and returns plain schemas rather than session-bound rows.
+    # ``total`` is the count from the caller's feed token, so only the page
+    # itself is queried here
+    db = SessionLocal()
+    try:
+        query = feed_query(db, campus, category, subcategory, search, include_expired)
+        
+        # Apply pagination and ordering (id breaks ties the same way the hot set does)
+        query = query.order_by(desc(Notice.priority), desc(Notice.created_at), desc(Notice.id))
+        offset = (page - 1) * per_page
+        notices = query.offset(offset).limit(per_page).all()
+        
+        return NoticeList(
+            notices=[NoticeSchema.model_validate(notice) for notice in notices],
+            total=total,
+            page=page,
+            per_page=per_page,
+            total_pages=math.ceil(total / per_page)
+        )
+    finally:
+        db.close()
+
+def _load_first_page_rest(
+    campus: str,
+    category: Optional[str],
+    subcategory: Optional[str],
+    limit: int
+) -> list[NoticeSchema]:
+    """The part of the first feed page below the hot set's priority cutoff."""
+    db = SessionLocal()
+    try:
+        notices = feed_query(db, campus, category, subcategory, None, False).filter(
+            or_(Notice.priority < hot_set.min_priority, Notice.priority.is_(None))
+        ).order_by(desc(Notice.priority), desc(Notice.created_at), desc(Notice.id)).limit(limit).all()
+        return [NoticeSchema.model_validate(notice) for notice in notices]
+    finally:
+        db.close()
+
+def _load_feed_token(
+    campus: str,
+    category: Optional[str],
+    subcategory: Optional[str],
+    search: Optional[str],
+    include_expired: bool
+):
+    """Cheap version token for a feed query: (row count, newest row change)."""
+    db = SessionLocal()
+    try:
+        return feed_query(db, campus, category, subcategory, search, include_expired).with_entities(
+            func.count(Notice.id),
+            func.max(func.coalesce(Notice.updated_at, Notice.created_at))
+        ).one()
+    finally:
+        db.close()
+
+def _notice_validators(notice: Notice):
+    last_modified = notice.updated_at or notice.created_at
+    stamp = int(as_utc(last_modified).timestamp() * 1_000_000) if last_modified else 0
+    return f'"n{notice.id}-r{notice.revision}-{stamp}"', last_modified
+
+def _cache_headers(etag: str, last_modified, cache_control: str) -> dict:
+    # Anonymous readers can pick the campus with X-Campus, so shared caches
+    # must key on it or they would hand one campus's board to another
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": CAMPUS_HEADER}
+    if last_modified:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+def _load_subcategories(campus: str, category: str) -> list[str]:
+    db = SessionLocal()
+    try:
+        subcategories = db.query(Notice.subcategory).filter(
+            and_(Notice.campus == campus, Notice.category == category, Notice.subcategory.isnot(None))
+        ).distinct().all()
+        return [sub[0] for sub in subcategories if sub[0]]
+    finally:
+        db.close()
+
+@router.get("/", response_model=NoticeList)
+async def get_notices(
+    request: Request,
+    response: Response,
+    category: Optional[str] = Query(None, regex="^(main|club|department)$"),
+    subcategory: Optional[str] = Query(None),
+    search: Optional[str] = Query(None),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100),
+    include_expired: bool = Query(False),
+    campus: str = Depends(get_request_campus)
+):
+    # This endpoint is now public - no authentication required
+    # ILIKE ignores case and surrounding whitespace never matters to users, so
+    # normalize the search term before it becomes part of the coalescing key
+    search = search.strip().lower() if search and search.strip() else None
+    filters = (campus, category, subcategory, search, include_expired)
+    params = filters + (page, per_page)
+    version = feed_state.version_for(campus)
     
-    # Apply pagination and ordering
-    query = query.order_by(desc(Notice.priority), desc(Notice.created_at))
-    offset = (page - 1) * per_page
-    notices = query.offset(offset).limit(per_page).all()
+    # Any insert, edit, delete or expiry inside the filter moves the count or the
+    # newest timestamp, so the pair versions the whole result set
+    count, last_modified = await feed_token_flight.do(
+        (version, filters), _load_feed_token, *filters
+    )
+    token = repr((params, count, as_utc(last_modified).isoformat() if last_modified else None))
+    etag = '"f-' + hashlib.sha1(token.encode()).hexdigest()[:24] + '"'
+    # No Last-Modified on the collection: deletes and expiries change the
+    # result without moving the newest timestamp, so only the ETag (which also
+    # covers the count) is a safe validator and If-Modified-Since is ignored
+    headers = _cache_headers(
+        etag, None,
+        f"public, max-age={settings.FEED_CACHE_MAX_AGE}, "
+        f"stale-while-revalidate={settings.FEED_STALE_WHILE_REVALIDATE}"
+    )
+    if is_not_modified(request.headers, etag, None):
+        return Response(status_code=304, headers=headers)
+    
+    response.headers.update(headers)
     
-    total_pages = math.ceil(total / per_page)
+    # The top of the first page comes from the in-memory hot set; the database
+    # only fills whatever the hot set leaves over. The set answers only when it
+    # was checked at this feed version and saw the same token as the ETag
+    # above, so the body never lags behind it
+    hot = None
+    if page == 1 and not search and not include_expired:
+        hot = hot_set.top(campus, category, subcategory, per_page, version, (count, last_modified))
+        if hot is None:
+            hot_set.stats["misses"] += 1
+    if hot is None:
+        return await notice_page_flight.do((version, params, count), _load_notice_page, *params, count)
     
+    notices = hot
+    if len(hot) < per_page:
+        hot_set.stats["partial_hits"] += 1
+        notices = hot + await notice_page_flight.do(
+            (version, "rest", params), _load_first_page_rest, campus, category, subcategory, per_page - len(hot)
+        )
+    else:
+        hot_set.stats["full_hits"] += 1
     return NoticeList(
         notices=notices,
-        total=total,
+        total=count,
         page=page,
         per_page=per_page,
-        total_pages=total_pages
+        total_pages=math.ceil(count / per_page)
     )
 
+@router.get("/subcategories", response_model=list[str])
+async def get_subcategories(
+    category: str = Query(..., regex="^(main|club|department)$"),
+    campus: str = Depends(get_request_campus)
+):
+    # This endpoint is now public - no authentication required
+    return await subcategory_flight.do(
+        (feed_state.version_for(campus), campus, category), _load_subcategories, campus, category
+    )
+
+@router.get("/suggest", response_model=list[NoticeSuggestion])
+async def suggest_notices(
+    q: str = Query(..., min_length=1, max_length=100),
+    category: Optional[str] = Query(None, regex="^(main|club|department)$"),
+    limit: int = Query(10, ge=1, le=25),
+    campus: str = Depends(get_request_campus)
+):
+    # Served from the in-memory prefix index, no database access per keystroke
+    return suggest_index.suggest(campus, q, limit=limit, category=category)
+
+def _get_notice_batch(db: Session, ids: list[int], current_user: Optional[User], campus: str) -> NoticeBatch:
+    ids = list(dict.fromkeys(ids))  # drop duplicates, keep the requested order
+    if len(ids) > settings.MAX_NOTICE_BATCH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.MAX_NOTICE_BATCH} notices can be fetched per batch"
+        )
+    
+    # One IN query for the whole batch instead of a round trip per notice
+    now = utcnow()
+    found = {
+        notice.id: notice
+        for notice in db.query(Notice).filter(Notice.campus == campus, Notice.id.in_(ids)).all()
+        if _visible_to(notice, current_user, now)
+    }
+    return NoticeBatch(
+        notices=[found[notice_id] for notice_id in ids if notice_id in found],
+        missing=[notice_id for notice_id in ids if notice_id not in found]
+    )
+
+@router.get("/batch", response_model=NoticeBatch)
+async def get_notices_batch(
+    ids: str = Query(..., description="Comma-separated notice ids"),
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    campus: str = Depends(get_request_campus)
+):
+    try:
+        notice_ids = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    if not notice_ids:
+        raise HTTPException(status_code=400, detail="No notice ids given")
+    return _get_notice_batch(db, notice_ids, current_user, campus)
+
+@router.post("/batch", response_model=NoticeBatch)
+async def post_notices_batch(
+    batch: NoticeBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    campus: str = Depends(get_request_campus)
+):
+    return _get_notice_batch(db, batch.ids, current_user, campus)
+
 @router.post("/", response_model=NoticeSchema)
 async def create_notice(
     notice: NoticeCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: User = Depends(get_current_author)
 ):
+    publish_at = as_utc(notice.publish_at)
+    now = utcnow()
+    is_admin = current_user.role == "admin"
     db_notice = Notice(
         **notice.dict(),
+        campus=current_user.campus,
         author_uid=current_user.uid,
-        author_name=current_user.name
+        author_name=current_user.name,
+        is_published=publish_at is None or publish_at <= now,
+        # Admin notices go straight to the board, faculty submissions wait for
+        # review (null() because a plain None would fall back to the column default)
+        is_approved=True if is_admin else null(),
+        approved_by=current_user.uid if is_admin else None,
+        approved_at=now if is_admin else None
     )
     db.add(db_notice)
     db.commit()
     db.refresh(db_notice)
+    notice_scheduler.schedule_notice(db_notice)
+    feed_state.notice_changed(db_notice)
+    await audit_log.record(current_user, "notice.create", "notice", db_notice.id, {"title": db_notice.title})
+    await webhook_dispatcher.visibility_event(db_notice, was_visible=False)
     return db_notice
 
 @router.get("/{notice_id}", response_model=NoticeSchema)
 async def get_notice(
     notice_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    campus: str = Depends(get_request_campus)
 ):
     # This endpoint is now public - no authentication required
-    notice = db.query(Notice).filter(Notice.id == notice_id).first()
-    if not notice:
-        raise HTTPException(status_code=404, detail="Notice not found")
+    notice = get_visible_notice(db, notice_id, current_user, campus)
     
-    # Check if notice is expired (unless user is admin)
-    if (notice.expires_at and notice.expires_at < datetime.utcnow() and 
-        (not current_user or current_user.role != "admin")):
-        raise HTTPException(status_code=404, detail="Notice not found")
+    etag, last_modified = _notice_validators(notice)
+    if current_user:
+        # Admins can see unpublished notices; keep those out of shared caches
+        cache_control = "private, no-cache"
+    else:
+        max_age = settings.NOTICE_CACHE_MAX_AGE
+        expires_at = as_utc(notice.expires_at)
+        if expires_at:
+            max_age = max(0, min(max_age, int((expires_at - utcnow()).total_seconds())))
+        cache_control = f"public, max-age={max_age}"
+    headers = _cache_headers(etag, last_modified, cache_control)
+    
+    # Answer revalidations before the row is serialized
+    if is_not_modified(request.headers, etag, last_modified):
+        return Response(status_code=304, headers=headers)
     
+    response.headers.update(headers)
     return notice
 
 @router.put("/{notice_id}", response_model=NoticeSchema)
@@ -105,16 +436,44 @@ async def update_notice(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin)
 ):
-    notice = db.query(Notice).filter(Notice.id == notice_id).first()
-    if not notice:
-        raise HTTPException(status_code=404, detail="Notice not found")
+    # Lock the row so concurrent edits can't claim the same revision number
+    notice = get_campus_notice(db, notice_id, current_user.campus, for_update=True)
+    was_visible = notice.is_visible(utcnow())
     
+    before = snapshot_of(notice)
     update_data = notice_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(notice, field, value)
     
+    # Moving publish_at into the future takes the notice off the board until then
+    if "publish_at" in update_data:
+        publish_at = as_utc(notice.publish_at)
+        notice.is_published = publish_at is None or publish_at <= utcnow()
+    
+    # Keep the replaced version as a reverse delta (or a periodic full snapshot)
+    after = snapshot_of(notice)
+    if after != before:
+        is_snapshot, data = build_revision(
+            before, after, notice.revision, settings.REVISION_SNAPSHOT_INTERVAL
+        )
+        db.add(NoticeRevision(
+            notice_id=notice.id,
+            revision=notice.revision,
+            is_snapshot=is_snapshot,
+            data=data,
+            superseded_by=current_user.uid
+        ))
+        notice.revision += 1
+    
     db.commit()
     db.refresh(notice)
+    notice_scheduler.schedule_notice(notice)
+    feed_state.notice_changed(notice)
+    await audit_log.record(
+        current_user, "notice.update", "notice", notice.id,
+        {"fields": sorted(update_data), "revision": notice.revision}
+    )
+    await webhook_dispatcher.visibility_event(notice, was_visible)
     return notice
 
 @router.delete("/{notice_id}")
@@ -123,22 +482,80 @@ async def delete_notice(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin)
 ):
-    notice = db.query(Notice).filter(Notice.id == notice_id).first()
-    if not notice:
-        raise HTTPException(status_code=404, detail="Notice not found")
+    notice = get_campus_notice(db, notice_id, current_user.campus)
+    
+    blob_hashes = [row[0] for row in db.query(NoticeAttachment.sha256).filter(
+        NoticeAttachment.notice_id == notice_id
+    ).all()]
+    db.query(NoticeAttachment).filter(NoticeAttachment.notice_id == notice_id).delete()
+    title, campus = notice.title, notice.campus
+    was_visible = notice.is_visible(utcnow())
     
     db.delete(notice)
+    release_blobs(db, blob_hashes)
     db.commit()
+    notice_scheduler.unschedule(notice_id)
+    feed_state.notice_removed(campus, notice_id)
+    await audit_log.record(current_user, "notice.delete", "notice", notice_id, {"title": title})
+    if was_visible:
+        # Subscribers never heard of notices that weren't on the board
+        await webhook_dispatcher.notice_event("notice.deleted", campus=campus, notice_id=notice_id)
     return {"message": "Notice deleted successfully"}
 
-@router.get("/subcategories", response_model=list[str])
-async def get_subcategories(
-    category: str = Query(..., regex="^(main|club|department)$"),
-    db: Session = Depends(get_db)
+@router.get("/{notice_id}/revisions", response_model=list[NoticeRevisionInfo])
+async def list_notice_revisions(
+    notice_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
 ):
-    # This endpoint is now public - no authentication required
-    subcategories = db.query(Notice.subcategory).filter(
-        and_(Notice.category == category, Notice.subcategory.isnot(None))
-    ).distinct().all()
+    notice = get_campus_notice(db, notice_id, current_user.campus)
+    
+    rows = db.query(
+        NoticeRevision.revision,
+        NoticeRevision.is_snapshot,
+        func.octet_length(NoticeRevision.data),
+        NoticeRevision.superseded_by,
+        NoticeRevision.superseded_at
+    ).filter(NoticeRevision.notice_id == notice_id).order_by(desc(NoticeRevision.revision)).all()
+    
+    # The current version lives in the notices row itself
+    revisions = [NoticeRevisionInfo(
+        revision=notice.revision, is_current=True, is_snapshot=True, stored_bytes=0
+    )]
+    revisions.extend(
+        NoticeRevisionInfo(
+            revision=revision,
+            is_current=False,
+            is_snapshot=is_snapshot,
+            stored_bytes=stored_bytes,
+            superseded_by=superseded_by,
+            superseded_at=superseded_at
+        )
+        for revision, is_snapshot, stored_bytes, superseded_by, superseded_at in rows
+    )
+    return revisions
+
+@router.get("/{notice_id}/revisions/{revision}", response_model=NoticeRevisionSchema)
+async def get_notice_revision(
+    notice_id: int,
+    revision: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    notice = get_campus_notice(db, notice_id, current_user.campus)
+    if not 1 <= revision <= notice.revision:
+        raise HTTPException(status_code=404, detail="Revision not found")
+    
+    # Only fetch the deltas between the target and the next snapshot above it
+    low, high = chain_bounds(revision, notice.revision, settings.REVISION_SNAPSHOT_INTERVAL)
+    rows = db.query(
+        NoticeRevision.revision, NoticeRevision.is_snapshot, NoticeRevision.data
+    ).filter(
+        NoticeRevision.notice_id == notice_id,
+        NoticeRevision.revision.between(low, high)
+    ).all()
     
-    return [sub[0] for sub in subcategories if sub[0]]
+    version = reconstruct(snapshot_of(notice), notice.revision, rows, revision)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Revision not found")
+    return NoticeRevisionSchema(notice_id=notice_id, revision=revision, **version)
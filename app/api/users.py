@@ -6,9 +6,24 @@ from ..database import get_db
 from ..models.user import User
 from ..schemas.user import UserCreate, UserUpdate, User as UserSchema
 from ..core.security import get_current_user, get_current_admin
+from ..core.audit import audit_log
+from ..core.tenancy import normalize_campus
 
 router = APIRouter()
 
+AUDITED_FIELDS = {"role": "user.role_change", "is_active": "user.activation_change"}
+
+def _audited_changes(user: User, update_data: dict) -> dict:
+    return {
+        field: {"from": getattr(user, field), "to": update_data[field]}
+        for field in AUDITED_FIELDS
+        if field in update_data and getattr(user, field) != update_data[field]
+    }
+
+async def _record_user_changes(actor: User, user: User, changes: dict) -> None:
+    for field, change in changes.items():
+        await audit_log.record(actor, AUDITED_FIELDS[field], "user", user.uid, change)
+
 @router.post("/", response_model=UserSchema)
 async def create_user(
     user: UserCreate,
@@ -19,7 +34,7 @@ async def create_user(
     if existing_user:
         raise HTTPException(status_code=400, detail="User already registered")
     
-    db_user = User(**user.dict())
+    db_user = User(**user.dict(exclude={"campus"}), campus=normalize_campus(user.campus))
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
@@ -47,11 +62,13 @@ async def update_current_user(
     if current_user.role != "admin" and "role" in update_data:
         del update_data["role"]
     
+    changes = _audited_changes(current_user, update_data) if current_user.role == "admin" else {}
     for field, value in update_data.items():
         setattr(current_user, field, value)
     
     db.commit()
     db.refresh(current_user)
+    await _record_user_changes(current_user, current_user, changes)
     return current_user
 
 @router.get("/", response_model=list[UserSchema])
@@ -59,7 +76,7 @@ async def get_users(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin)
 ):
-    return db.query(User).all()
+    return db.query(User).filter(User.campus == current_user.campus).all()
 
 @router.put("/{user_uid}", response_model=UserSchema)
 async def update_user(
@@ -68,14 +85,16 @@ async def update_user(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin)
 ):
-    user = db.query(User).filter(User.uid == user_uid).first()
+    user = db.query(User).filter(User.uid == user_uid, User.campus == current_user.campus).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     update_data = user_update.dict(exclude_unset=True)
+    changes = _audited_changes(user, update_data)
     for field, value in update_data.items():
         setattr(user, field, value)
     
     db.commit()
     db.refresh(user)
+    await _record_user_changes(current_user, user, changes)
     return user
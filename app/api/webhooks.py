@@ -0,0 +1,114 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from typing import List
+import secrets
+
+from ..database import get_db
+from ..models.user import User
+from ..models.webhook import WebhookDelivery, WebhookSubscription
+from ..schemas.webhook import (
+    WebhookSubscription as WebhookSubscriptionSchema,
+    WebhookSubscriptionCreate,
+    WebhookSubscriptionCreated,
+    WebhookSubscriptionUpdate,
+)
+from ..core.security import get_current_admin
+from ..core.audit import audit_log
+from ..core.webhooks import webhook_dispatcher
+
+router = APIRouter()
+
+def _get_subscription(db: Session, subscription_id: int, campus: str) -> WebhookSubscription:
+    subscription = db.query(WebhookSubscription).filter(
+        WebhookSubscription.id == subscription_id, WebhookSubscription.campus == campus
+    ).first()
+    if not subscription:
+        raise HTTPException(status_code=404, detail="Webhook subscription not found")
+    return subscription
+
+def _delivery_counts(db: Session, subscription_ids: List[int]) -> dict:
+    """{subscription_id: {"pending": n, "dead": n}}; dead rows have no next attempt."""
+    counts = {}
+    rows = db.query(
+        WebhookDelivery.subscription_id,
+        WebhookDelivery.next_attempt_at.is_(None),
+        func.count(WebhookDelivery.id)
+    ).filter(WebhookDelivery.subscription_id.in_(subscription_ids)).group_by(
+        WebhookDelivery.subscription_id, WebhookDelivery.next_attempt_at.is_(None)
+    ).all()
+    for subscription_id, dead, count in rows:
+        counts.setdefault(subscription_id, {"pending": 0, "dead": 0})["dead" if dead else "pending"] = count
+    return counts
+
+def _with_counts(subscription: WebhookSubscription, counts: dict) -> WebhookSubscriptionSchema:
+    result = WebhookSubscriptionSchema.model_validate(subscription)
+    result.pending_deliveries = counts.get("pending", 0)
+    result.dead_deliveries = counts.get("dead", 0)
+    return result
+
+@router.get("/", response_model=List[WebhookSubscriptionSchema])
+async def list_webhooks(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    subscriptions = db.query(WebhookSubscription).filter(
+        WebhookSubscription.campus == current_user.campus
+    ).order_by(WebhookSubscription.id).all()
+    counts = _delivery_counts(db, [s.id for s in subscriptions])
+    return [_with_counts(s, counts.get(s.id, {})) for s in subscriptions]
+
+@router.post("/", response_model=WebhookSubscriptionCreated)
+async def create_webhook(
+    subscription: WebhookSubscriptionCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    db_subscription = WebhookSubscription(
+        campus=current_user.campus,
+        url=subscription.url,
+        secret=secrets.token_hex(32),
+        events=",".join(sorted(set(subscription.events))),
+        is_active=True,
+        created_by=current_user.uid
+    )
+    db.add(db_subscription)
+    db.commit()
+    db.refresh(db_subscription)
+    await audit_log.record(current_user, "webhook.create", "webhook", db_subscription.id, {"url": subscription.url})
+    return WebhookSubscriptionCreated.model_validate(db_subscription)
+
+@router.put("/{subscription_id}", response_model=WebhookSubscriptionSchema)
+async def update_webhook(
+    subscription_id: int,
+    subscription_update: WebhookSubscriptionUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    subscription = _get_subscription(db, subscription_id, current_user.campus)
+    update_data = subscription_update.dict(exclude_unset=True)
+    if "events" in update_data:
+        update_data["events"] = ",".join(sorted(set(update_data["events"])))
+    for field, value in update_data.items():
+        setattr(subscription, field, value)
+    db.commit()
+    db.refresh(subscription)
+    if subscription.is_active:
+        # Re-enabled subscriptions may have a backlog waiting
+        webhook_dispatcher.notify()
+    await audit_log.record(current_user, "webhook.update", "webhook", subscription.id, {"fields": sorted(update_data)})
+    return _with_counts(subscription, _delivery_counts(db, [subscription.id]).get(subscription.id, {}))
+
+@router.delete("/{subscription_id}")
+async def delete_webhook(
+    subscription_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    subscription = _get_subscription(db, subscription_id, current_user.campus)
+    url = subscription.url
+    db.query(WebhookDelivery).filter(WebhookDelivery.subscription_id == subscription.id).delete()
+    db.delete(subscription)
+    db.commit()
+    await audit_log.record(current_user, "webhook.delete", "webhook", subscription_id, {"url": url})
+    return {"message": "Webhook subscription deleted successfully"}
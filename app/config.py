@@ -9,10 +9,84 @@ class Settings(BaseSettings):
     FIREBASE_CREDENTIALS_PATH: Optional[str] = None
     FIREBASE_CREDENTIALS_JSON: Optional[str] = None
     
+    # Campuses (tenants)
+    DEFAULT_CAMPUS: str = "main"
+    CAMPUSES: list = []  # allowed campus keys; empty accepts any well-formed key
+    CAMPUS_CLAIM: str = "campus"  # Firebase custom claim carrying the user's campus
+    
+    # Startup
+    STARTUP_MODE: str = "development"  # production: lazy Firebase init, no DDL on boot (Alembic owns the schema)
+    DB_POOL_PREWARM: int = 0  # connections to open before serving
+    PREWARM_CACHES: bool = True  # build in-memory indexes before serving rather than in the background
+    
     # API
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "Virtual Notice Board"
     
+    # HTTP caching (seconds)
+    NOTICE_CACHE_MAX_AGE: int = 60
+    FEED_CACHE_MAX_AGE: int = 15
+    FEED_STALE_WHILE_REVALIDATE: int = 30
+    
+    # Batch reads
+    MAX_NOTICE_BATCH: int = 100
+    
+    # Hot set: top-priority notices served from memory on the first feed page
+    HOT_SET_MIN_PRIORITY: int = 8
+    HOT_SET_MAX_PER_CATEGORY: int = 200
+    HOT_SET_REFRESH_SECONDS: int = 30
+    
+    # Search suggestions
+    SUGGEST_REFRESH_SECONDS: int = 300
+    
+    # Attachments
+    ATTACHMENTS_DIR: str = "storage/attachments"
+    MAX_ATTACHMENT_SIZE: int = 25 * 1024 * 1024
+    ATTACHMENT_CHUNK_SIZE: int = 1024 * 1024
+    
+    # Revisions
+    REVISION_SNAPSHOT_INTERVAL: int = 10
+    
+    # Audit log
+    AUDIT_QUEUE_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 200
+    AUDIT_FLUSH_INTERVAL: float = 1.0
+    
+    # Mail
+    MAIL_SENDER: str = "outbox"  # outbox (local Maildir) or smtp
+    MAIL_FROM: str = "Virtual Notice Board <noticeboard@localhost>"
+    MAIL_OUTBOX_DIR: str = "storage/outbox"
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 587
+    SMTP_USERNAME: Optional[str] = None
+    SMTP_PASSWORD: Optional[str] = None
+    SMTP_STARTTLS: bool = True
+    
+    # Department digests
+    DIGEST_MAX_RECIPIENTS: int = 100  # recipients per message; relays cap RCPT TO counts
+    DIGEST_SETTLE_SECONDS: int = 60  # leave the newest notices for the next run so late commits aren't skipped
+    DIGEST_INITIAL_LOOKBACK_HOURS: int = 24  # how far back a department's first digest reaches
+    
+    # Outbound webhooks
+    WEBHOOK_QUEUE_SIZE: int = 10000
+    WEBHOOK_BATCH_SIZE: int = 50  # events per POST to one endpoint
+    WEBHOOK_CONCURRENCY: int = 8  # parallel sends, also the HTTP connection pool size
+    WEBHOOK_TIMEOUT: float = 10.0
+    WEBHOOK_MAX_ATTEMPTS: int = 8
+    WEBHOOK_BACKOFF_BASE: float = 5.0  # seconds before the first retry, doubled after each failure
+    WEBHOOK_BACKOFF_MAX: float = 3600.0
+    WEBHOOK_POLL_SECONDS: float = 5.0  # how often to look for due retries
+    WEBHOOK_LEASE_SECONDS: int = 60  # claimed rows come back if a worker dies mid-send
+    
+    # Tracing
+    TRACE_SAMPLE_RATE: float = 0.0  # fraction of requests traced; 0 disables tracing
+    TRACE_TRUST_UPSTREAM: bool = False  # follow a traceparent's sampled flag (only behind a trusted proxy)
+    TRACE_FILE: str = "traces/traces.jsonl"
+    TRACE_EXPORT_FORMAT: str = "jsonl"  # jsonl, or otlp for OTLP/JSON lines
+    TRACE_MAX_BYTES: int = 10 * 1024 * 1024
+    TRACE_BACKUP_COUNT: int = 5
+    TRACE_SERVICE_NAME: str = "virtual-notice-board"
+    
     # CORS
     BACKEND_CORS_ORIGINS: list = ["http://localhost:3000", "https://yourdomain.com"]
     
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import logging
+from typing import List, Optional
+
+from sqlalchemy import insert
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.audit import AuditEvent
+from ..utils.helpers import utcnow
+
+logger = logging.getLogger(__name__)
+
+WRITE_ATTEMPTS = 3
+
+
+class AuditLogger:
+    """Records admin actions without adding a database round trip to the request.
+
+    Handlers enqueue events in memory; a background task drains the queue and
+    writes them with one multi-row INSERT per batch. When the queue is full,
+    ``record`` waits for room instead of dropping events, which slows writers
+    down to the rate the database can absorb.
+    """
+
+    def __init__(self, session_factory, max_queue: int, batch_size: int, flush_interval: float):
+        self._session_factory = session_factory
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"recorded": 0, "written": 0, "batches": 0, "dropped": 0, "backpressure_waits": 0}
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+        # Give queued events a chance to reach the database before shutting down
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=10)
+        except asyncio.TimeoutError:
+            logger.warning("Audit log shut down with %d unflushed events", self._queue.qsize())
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._queue = None
+
+    async def record(
+        self,
+        actor,
+        action: str,
+        target_type: str,
+        target_id,
+        details: Optional[dict] = None,
+    ) -> None:
+        """Queue an event performed by ``actor`` (a User) within their campus."""
+        event = {
+            "campus": actor.campus,
+            "actor_uid": actor.uid,
+            "action": action,
+            "target_type": target_type,
+            "target_id": str(target_id),
+            "details": json.dumps(details, default=str) if details is not None else None,
+            "created_at": utcnow(),
+        }
+        self.stats["recorded"] += 1
+        if self._queue is None:
+            # Not running inside the app (scripts, shell): write straight through
+            await asyncio.to_thread(self._write, [event])
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.stats["backpressure_waits"] += 1
+            await self._queue.put(event)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: List[dict]) -> None:
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            try:
+                await asyncio.to_thread(self._write, batch)
+                self.stats["written"] += len(batch)
+                self.stats["batches"] += 1
+                return
+            except Exception:
+                logger.exception("Audit batch write failed (attempt %d/%d)", attempt, WRITE_ATTEMPTS)
+                await asyncio.sleep(attempt)
+        self.stats["dropped"] += len(batch)
+
+    def _write(self, batch: List[dict]) -> None:
+        db = self._session_factory()
+        try:
+            db.execute(insert(AuditEvent), batch)
+            db.commit()
+        finally:
+            db.close()
+
+
+audit_log = AuditLogger(
+    session_factory=SessionLocal,
+    max_queue=settings.AUDIT_QUEUE_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL,
+)
@@ -0,0 +1,184 @@
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.digest import DigestWatermark
+from ..models.notice import Notice
+from ..models.user import User
+from ..utils.helpers import as_utc, utcnow
+from .mail import MailSender, get_mail_sender
+
+logger = logging.getLogger(__name__)
+
+# Characters of notice content quoted under each title
+EXCERPT_LENGTH = 280
+NO_DEPARTMENT = ""
+
+
+def became_visible(notice: Notice) -> datetime:
+    """When the notice went up on the board: the later of approval and publication."""
+    times = [t for t in (as_utc(notice.approved_at), as_utc(notice.publish_at)) if t is not None]
+    return max(times) if times else as_utc(notice.created_at)
+
+
+def _excerpt(content: str) -> str:
+    text = " ".join(content.split())
+    return text if len(text) <= EXCERPT_LENGTH else text[:EXCERPT_LENGTH - 1].rstrip() + "…"
+
+
+def render_digest(campus: str, department: str, since: datetime, notices: List[Notice]) -> EmailMessage:
+    audience = department or "everyone"
+    message = EmailMessage()
+    message["From"] = settings.MAIL_FROM
+    message["To"] = "undisclosed-recipients:;"
+    message["Subject"] = f"{len(notices)} new notice{'s' if len(notices) != 1 else ''} for {audience}"
+
+    lines = [f"New on the {campus} notice board since {since:%d %b %Y %H:%M} UTC:", ""]
+    for notice in notices:
+        where = notice.subcategory or notice.category
+        lines.append(f"* {notice.title} ({where}{', high priority' if (notice.priority or 0) >= 5 else ''})")
+        lines.append(f"  {_excerpt(notice.content)}")
+        lines.append("")
+    message.set_content("\n".join(lines))
+    return message
+
+
+class DigestJob:
+    """Emails each department the notices that went up since its last digest.
+
+    Work is grouped so the cost follows departments, not users: each campus
+    reads its new notices once, each department's digest is rendered once,
+    and that one message goes to the department's members in chunks of
+    DIGEST_MAX_RECIPIENTS. Members without a department get the campus-wide
+    notices only. Per-department watermarks mean a run only reads notices
+    approved or published since the oldest watermark on the campus.
+
+    A department's watermark is advanced, under a row lock, right after its
+    digest is sent. Overlapping runs therefore skip departments already done,
+    and a crash resends at most the department that was in flight.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        sender_factory: Callable[[], MailSender] = get_mail_sender,
+    ):
+        self._session_factory = session_factory
+        self._sender_factory = sender_factory
+
+    def run(self, now: Optional[datetime] = None, campuses: Optional[List[str]] = None) -> dict:
+        now = now or utcnow()
+        # Rows committed just before ``now`` may not be visible to this
+        # transaction yet, so the newest few seconds wait for the next run
+        upper = now - timedelta(seconds=settings.DIGEST_SETTLE_SECONDS)
+        stats = {"campuses": 0, "departments": 0, "messages": 0, "recipients": 0, "notices": 0}
+
+        db = self._session_factory()
+        sender = self._sender_factory()
+        try:
+            if campuses is None:
+                campuses = [c for (c,) in db.query(User.campus).filter(User.is_active == True).distinct()]
+            for campus in campuses:
+                self._run_campus(db, sender, campus, upper, now, stats)
+                stats["campuses"] += 1
+        finally:
+            sender.close()
+            db.close()
+        return stats
+
+    def _members(self, db: Session, campus: str) -> Dict[str, List[str]]:
+        members = defaultdict(list)
+        rows = db.query(User.department, User.email).filter(User.campus == campus, User.is_active == True)
+        for department, email in rows:
+            members[department or NO_DEPARTMENT].append(email)
+        return members
+
+    def _ensure_watermarks(self, db: Session, campus: str, departments, upper: datetime) -> Dict[str, datetime]:
+        existing = {
+            mark.department: as_utc(mark.watermark)
+            for mark in db.query(DigestWatermark).filter(DigestWatermark.campus == campus)
+        }
+        missing = [d for d in departments if d not in existing]
+        if missing:
+            start = upper - timedelta(hours=settings.DIGEST_INITIAL_LOOKBACK_HOURS)
+            db.add_all(DigestWatermark(campus=campus, department=d, watermark=start) for d in missing)
+            try:
+                db.commit()
+            except IntegrityError:
+                # A concurrent run created them first; its values are as good as ours
+                db.rollback()
+                return self._ensure_watermarks(db, campus, departments, upper)
+            existing.update((d, start) for d in missing)
+        return existing
+
+    def _new_notices(self, db: Session, campus: str, since: datetime, upper: datetime, now: datetime) -> List[Notice]:
+        notices = db.query(Notice).filter(
+            Notice.campus == campus,
+            Notice.is_active == True, Notice.is_approved == True, Notice.is_published == True,
+            Notice.category.in_(("main", "department")),
+            or_(Notice.approved_at > since, Notice.publish_at > since),
+        ).order_by(Notice.priority.desc(), Notice.created_at.desc()).all()
+        # Detach so the per-department commits don't expire them into N refreshes
+        for notice in notices:
+            db.expunge(notice)
+        return [n for n in notices if n.is_visible(now) and since < became_visible(n) <= upper]
+
+    def _run_campus(self, db: Session, sender: MailSender, campus: str, upper: datetime, now: datetime, stats: dict):
+        members = self._members(db, campus)
+        if not members:
+            return
+        watermarks = self._ensure_watermarks(db, campus, members, upper)
+        since = min(watermarks[d] for d in members)
+        if since >= upper:
+            return
+
+        # One read for the whole campus, split by audience in memory
+        campus_wide, by_department = [], defaultdict(list)
+        for notice in self._new_notices(db, campus, since, upper, now):
+            if notice.category == "main":
+                campus_wide.append(notice)
+            else:
+                by_department[notice.subcategory].append(notice)
+
+        for department, recipients in members.items():
+            mark = db.query(DigestWatermark).filter(
+                DigestWatermark.campus == campus, DigestWatermark.department == department
+            ).with_for_update().one()
+            watermark = as_utc(mark.watermark)
+            if watermark >= upper:
+                # Another run already covered this window
+                db.rollback()
+                continue
+
+            candidates = campus_wide + by_department.get(department, []) if department else campus_wide
+            notices = sorted(
+                (n for n in candidates if became_visible(n) > watermark),
+                key=lambda n: (n.priority or 0, as_utc(n.created_at)), reverse=True,
+            )
+            if notices:
+                message = render_digest(campus, department, watermark, notices)
+                chunk = settings.DIGEST_MAX_RECIPIENTS
+                for start in range(0, len(recipients), chunk):
+                    sender.send(message, recipients[start:start + chunk])
+                    stats["messages"] += 1
+                stats["recipients"] += len(recipients)
+                stats["notices"] += len(notices)
+                stats["departments"] += 1
+
+            mark.watermark = upper
+            mark.last_run_at = now
+            mark.last_notice_count = len(notices)
+            mark.last_recipient_count = len(recipients) if notices else 0
+            db.commit()
+            logger.info(
+                "Digest for %s/%s: %d notices to %d members",
+                campus, department or "-", len(notices), len(recipients) if notices else 0,
+            )
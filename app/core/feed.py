@@ -0,0 +1,50 @@
+import logging
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Listener signature: (notice_id, notice). ``notice`` is the freshly written row,
+# or None when the notice was deleted. Rows may be bound to the caller's session,
+# so listeners should copy whatever they need instead of holding on to them.
+FeedListener = Callable[[int, Optional[object]], None]
+
+
+class FeedState:
+    """Process-wide view of the public notice feeds, one per campus.
+
+    Every change that can alter what a board shows (a write, a scheduled publish,
+    an expiry) goes through here. The campus's version is bumped so anything
+    derived from its feed can tell it is stale, and registered listeners are told
+    which notice moved. Other campuses' versions are left alone.
+    """
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._listeners: List[FeedListener] = []
+
+    def version_for(self, campus: str) -> int:
+        return self._versions.get(campus, 0)
+
+    def snapshot(self) -> Dict[str, int]:
+        """Every campus's current version, for work that spans campuses."""
+        return dict(self._versions)
+
+    def subscribe(self, listener: FeedListener) -> None:
+        self._listeners.append(listener)
+
+    def notice_changed(self, notice) -> None:
+        self._bump(notice.campus, notice.id, notice)
+
+    def notice_removed(self, campus: str, notice_id: int) -> None:
+        self._bump(campus, notice_id, None)
+
+    def _bump(self, campus: str, notice_id: int, notice) -> None:
+        self._versions[campus] = self._versions.get(campus, 0) + 1
+        for listener in self._listeners:
+            try:
+                listener(notice_id, notice)
+            except Exception:
+                logger.exception("Feed listener failed for notice %s", notice_id)
+
+
+feed_state = FeedState()
@@ -1,24 +1,65 @@
-import firebase_admin
-from firebase_admin import credentials, auth
-from fastapi import HTTPException, status
+import asyncio
 import json
+import logging
+import threading
+
+from fastapi import HTTPException, status
 from ..config import settings
 
+logger = logging.getLogger(__name__)
+
+# firebase_admin pulls in the google-auth stack, which takes a noticeable share
+# of worker boot time, so it is imported on first use rather than at import time
+_init_lock = threading.Lock()
+_initialized = False
+
+def firebase_configured() -> bool:
+    return bool(settings.FIREBASE_CREDENTIALS_JSON or settings.FIREBASE_CREDENTIALS_PATH)
+
 def initialize_firebase():
-    if not firebase_admin._apps:
-        if settings.FIREBASE_CREDENTIALS_JSON:
-            # For Railway deployment with JSON as env variable
-            cred_dict = json.loads(settings.FIREBASE_CREDENTIALS_JSON)
-            cred = credentials.Certificate(cred_dict)
-        elif settings.FIREBASE_CREDENTIALS_PATH:
-            # For local development with file path
-            cred = credentials.Certificate(settings.FIREBASE_CREDENTIALS_PATH)
-        else:
-            raise ValueError("Firebase credentials not configured")
-        
-        firebase_admin.initialize_app(cred)
+    global _initialized
+    if _initialized:
+        return
+    with _init_lock:
+        if _initialized:
+            return
+        import firebase_admin
+        from firebase_admin import credentials
+
+        if not firebase_admin._apps:
+            if settings.FIREBASE_CREDENTIALS_JSON:
+                # For Railway deployment with JSON as env variable
+                cred_dict = json.loads(settings.FIREBASE_CREDENTIALS_JSON)
+                cred = credentials.Certificate(cred_dict)
+            elif settings.FIREBASE_CREDENTIALS_PATH:
+                # For local development with file path
+                cred = credentials.Certificate(settings.FIREBASE_CREDENTIALS_PATH)
+            else:
+                raise ValueError("Firebase credentials not configured")
+
+            firebase_admin.initialize_app(cred)
+        _initialized = True
+
+async def _ensure_initialized():
+    if _initialized:
+        return
+    try:
+        # In production mode this is where init happens; the import and the
+        # credential parsing block, so they run off the event loop and
+        # concurrent first requests queue on the init lock
+        await asyncio.to_thread(initialize_firebase)
+    except Exception:
+        # A server fault, not a bad token: fail loudly rather than reporting
+        # 401 and letting optional auth quietly treat everyone as anonymous
+        logger.critical("Firebase initialization failed; authenticated requests will fail", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Authentication is not configured"
+        )
 
 async def verify_firebase_token(token: str) -> dict:
+    await _ensure_initialized()
+    from firebase_admin import auth
     try:
         decoded_token = auth.verify_id_token(token)
         return decoded_token
@@ -0,0 +1,341 @@
+import asyncio
+import heapq
+import logging
+from bisect import insort
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, or_
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.notice import Notice
+from ..schemas.notice import Notice as NoticeSchema
+from ..utils.helpers import as_utc, utcnow
+from .feed import feed_state
+
+logger = logging.getLogger(__name__)
+
+# (-priority, -created_at, -id): ascending order is the feed's display order
+SortKey = Tuple[int, float, int]
+Entry = Tuple[SortKey, NoticeSchema, Optional[datetime]]  # (key, notice, expires_at)
+# (row count, newest row change) of a feed, as the feed's ETag uses
+FeedToken = Tuple[int, Optional[datetime]]
+# Feed tokens of one campus by (category, subcategory); None means unfiltered
+TokenTable = Dict[Tuple[Optional[str], Optional[str]], FeedToken]
+
+
+def sort_key(notice) -> SortKey:
+    created_at = as_utc(notice.created_at)
+    return (-(notice.priority or 0), -(created_at.timestamp() if created_at else 0.0), -notice.id)
+
+
+def _changed_at(notice) -> Optional[datetime]:
+    return notice.updated_at or notice.created_at
+
+
+class HotSet:
+    """Top-priority visible notices per (campus, category), kept in feed order.
+
+    The first feed page is mostly these notices, so it can be served from here
+    and only the rest of the page has to come from the database. Entries are
+    updated from feed changes, skipped once they expire, and rebuilt
+    periodically to pick up writes made by other workers. Each list holds at
+    most ``max_per_category`` entries; a list that had to be cut is marked so
+    lookups fall back to the database if removals leave it short.
+
+    Each campus is checked against the database at a known feed version: the
+    feed tokens of every category/subcategory filter are recorded, together
+    with the version they were read at. Lookups are answered only while the
+    campus's version is unchanged and the request's own feed token equals the
+    recorded one, so a page never lags behind its ETag, and no extra query is
+    needed to find out. A write in this process applies its change here and
+    schedules a re-check that reads the tokens again and compares the hot rows
+    with the set's entries; only a mismatch (a write from another worker)
+    costs a rebuild of that campus.
+    """
+
+    def __init__(self, min_priority: int, max_per_category: int, refresh_seconds: int, session_factory=SessionLocal):
+        self.min_priority = min_priority
+        self.max_per_category = max_per_category
+        self.refresh_seconds = refresh_seconds
+        self._session_factory = session_factory
+        self._lists: Dict[Tuple[str, str], List[Entry]] = {}
+        self._truncated: set = set()
+        self._where: Dict[int, Tuple[str, str]] = {}
+        self._tokens: Dict[str, TokenTable] = {}
+        self._versions: Dict[str, int] = {}
+        self._loaded = False
+        self._task: Optional[asyncio.Task] = None
+        self._checking: Dict[str, asyncio.Task] = {}
+        self._recheck: set = set()
+        self.stats = {"full_hits": 0, "partial_hits": 0, "misses": 0, "stale": 0, "rebuilds": 0}
+
+    async def start(self, build_now: bool = True) -> None:
+        if build_now:
+            await self.rebuild()
+        self._task = asyncio.create_task(self._refresh_loop(build_first=not build_now))
+
+    async def stop(self) -> None:
+        for task in [self._task, *self._checking.values()]:
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._checking = {}
+
+    async def rebuild(self, campus: Optional[str] = None) -> None:
+        """Rebuild the whole set, or only ``campus`` when given."""
+        versions = feed_state.snapshot()
+        lists, truncated, where, tokens = await asyncio.to_thread(self._build, campus)
+        versions = {name: versions.get(name, 0) for name in tokens}
+        if campus is None:
+            # Swap in one step so readers never see a half-built set
+            self._lists, self._truncated, self._where = lists, truncated, where
+            self._tokens, self._versions = tokens, versions
+            self._loaded = True
+            logger.info("Hot set built with %d notices", len(where))
+            return
+        self._lists = {key: entries for key, entries in self._lists.items() if key[0] != campus}
+        self._lists.update(lists)
+        self._truncated = {key for key in self._truncated if key[0] != campus} | truncated
+        self._where = {notice_id: key for notice_id, key in self._where.items() if key[0] != campus}
+        self._where.update(where)
+        self._tokens.update(tokens)
+        self._versions.update(versions)
+
+    async def check(self, campus: str) -> None:
+        """Re-read ``campus``'s tokens and rebuild it only if its hot rows moved."""
+        version = feed_state.version_for(campus)
+        tokens, rows = await asyncio.to_thread(self._load_check, campus)
+        if feed_state.version_for(campus) != version:
+            # A write landed meanwhile and queued another check; this read may
+            # predate it, so leave the verdict to that one
+            return
+        if self._entries_of(campus) != self._expected(rows):
+            self.stats["rebuilds"] += 1
+            await self.rebuild(campus)
+            return
+        self._tokens[campus] = tokens
+        self._versions[campus] = version
+
+    def _check_soon(self, campus: str) -> None:
+        if campus in self._checking:
+            # Writes landing mid-check may not be in what it read; look again
+            self._recheck.add(campus)
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self.check(campus))
+        self._checking[campus] = task
+
+        def done(task: asyncio.Task) -> None:
+            self._checking.pop(campus, None)
+            if not task.cancelled() and task.exception():
+                logger.error("Hot set check for %s failed", campus, exc_info=task.exception())
+            elif campus in self._recheck:
+                self._recheck.discard(campus)
+                self._check_soon(campus)
+
+        task.add_done_callback(done)
+
+    async def _refresh_loop(self, build_first: bool = False) -> None:
+        # Other workers write too; a periodic rebuild picks up their changes
+        while True:
+            if not build_first:
+                await asyncio.sleep(self.refresh_seconds)
+            build_first = False
+            try:
+                await self.rebuild()
+            except Exception:
+                logger.exception("Hot set refresh failed")
+
+    def _visible(self, campus: Optional[str], now: datetime) -> list:
+        visible = [
+            Notice.is_active == True, Notice.is_approved == True, Notice.is_published == True,
+            or_(Notice.expires_at.is_(None), Notice.expires_at > now),
+        ]
+        if campus is not None:
+            visible.append(Notice.campus == campus)
+        return visible
+
+    def _read_tokens(self, db, campus: Optional[str], now: datetime) -> Dict[str, TokenTable]:
+        # One row per (campus, category, subcategory); every filter the feed
+        # accepts is a sum over some of them
+        tokens: Dict[str, TokenTable] = {} if campus is None else {campus: {}}
+        for row_campus, category, subcategory, count, newest in db.query(
+            Notice.campus,
+            Notice.category,
+            Notice.subcategory,
+            func.count(Notice.id),
+            func.max(func.coalesce(Notice.updated_at, Notice.created_at)),
+        ).filter(*self._visible(campus, now)).group_by(Notice.campus, Notice.category, Notice.subcategory):
+            table = tokens.setdefault(row_campus, {})
+            filters = [(None, None), (category, None)]
+            if subcategory:
+                filters += [(None, subcategory), (category, subcategory)]
+            for key in filters:
+                total, latest = table.get(key, (0, None))
+                if latest is None or (newest is not None and newest > latest):
+                    latest = newest
+                table[key] = (total + count, latest)
+        return tokens
+
+    def _build(self, campus: Optional[str] = None):
+        now = utcnow()
+        lists: Dict[Tuple[str, str], List[Entry]] = {}
+        db = self._session_factory()
+        try:
+            # Tokens are read before the rows: a write landing in between makes
+            # the recorded token older than the rows, which only costs a
+            # fallback, never a stale page under a newer ETag
+            tokens = self._read_tokens(db, campus, now)
+            notices = db.query(Notice).filter(*self._visible(campus, now), Notice.priority >= self.min_priority).all()
+            for notice in notices:
+                if notice.is_visible(now):
+                    lists.setdefault((notice.campus, notice.category), []).append(self._entry(notice))
+        finally:
+            db.close()
+
+        truncated, where = set(), {}
+        for key, entries in lists.items():
+            entries.sort(key=lambda entry: entry[0])
+            if len(entries) > self.max_per_category:
+                del entries[self.max_per_category:]
+                truncated.add(key)
+            for entry in entries:
+                where[entry[1].id] = key
+        return lists, truncated, where, tokens
+
+    def _load_check(self, campus: str):
+        now = utcnow()
+        db = self._session_factory()
+        try:
+            # Same order as a build: tokens first, then the rows they must cover
+            tokens = self._read_tokens(db, campus, now)[campus]
+            rows = db.query(
+                Notice.id, Notice.category, Notice.priority, Notice.created_at, Notice.updated_at
+            ).filter(*self._visible(campus, now), Notice.priority >= self.min_priority).all()
+        finally:
+            db.close()
+        return tokens, rows
+
+    def _expected(self, rows) -> Dict[str, list]:
+        lists: Dict[str, list] = {}
+        for row in rows:
+            lists.setdefault(row.category, []).append((sort_key(row), row.id, as_utc(_changed_at(row))))
+        for category, entries in lists.items():
+            entries.sort()
+            lists[category] = [entry[1:] for entry in entries[:self.max_per_category]]
+        return lists
+
+    def _entries_of(self, campus: str) -> Dict[str, list]:
+        now = utcnow()
+        lists = {}
+        for (entry_campus, category), entries in self._lists.items():
+            if entry_campus != campus:
+                continue
+            current = [
+                (notice.id, as_utc(_changed_at(notice)))
+                for _, notice, expires_at in entries
+                if expires_at is None or expires_at > now
+            ]
+            if current:
+                lists[category] = current
+        return lists
+
+    def _entry(self, notice) -> Entry:
+        return sort_key(notice), NoticeSchema.model_validate(notice), as_utc(notice.expires_at)
+
+    def upsert(self, notice) -> None:
+        self.remove(notice.id)
+        if (notice.priority or 0) < self.min_priority or not notice.is_visible(utcnow()):
+            return
+        key = (notice.campus, notice.category)
+        entries = self._lists.setdefault(key, [])
+        insort(entries, self._entry(notice), key=lambda entry: entry[0])
+        self._where[notice.id] = key
+        if len(entries) > self.max_per_category:
+            dropped = entries.pop()
+            self._where.pop(dropped[1].id, None)
+            self._truncated.add(key)
+
+    def remove(self, notice_id: int) -> None:
+        key = self._where.pop(notice_id, None)
+        if key is None:
+            return
+        entries = self._lists.get(key, [])
+        for index, entry in enumerate(entries):
+            if entry[1].id == notice_id:
+                del entries[index]
+                break
+
+    def on_notice_change(self, notice_id: int, notice) -> None:
+        if notice is None:
+            campus = self._where.get(notice_id, (None,))[0]
+            self.remove(notice_id)
+        else:
+            campus = notice.campus
+            self.upsert(notice)
+        if campus is not None and self._loaded:
+            self._check_soon(campus)
+
+    def top(
+        self,
+        campus: str,
+        category: Optional[str],
+        subcategory: Optional[str],
+        limit: int,
+        version: int,
+        token: FeedToken,
+    ) -> Optional[List[NoticeSchema]]:
+        """Up to ``limit`` hot notices in feed order, or None when the set can't answer.
+
+        ``version`` is the campus's feed version and ``token`` the live token
+        of the requested filter; the set only answers when it was last checked
+        at that version and saw the same token.
+        """
+        if not self._loaded:
+            return None
+        recorded = self._tokens.get(campus, {}).get((category or None, subcategory or None), (0, None))
+        if self._versions.get(campus) != version or recorded != tuple(token):
+            self.stats["stale"] += 1
+            self._check_soon(campus)
+            return None
+        if category:
+            keys = [(campus, category)]
+        else:
+            keys = [key for key in self._lists if key[0] == campus]
+
+        now = utcnow()
+        expired = []
+        result = []
+        for _, notice, expires_at in heapq.merge(*(self._lists.get(key, []) for key in keys), key=lambda e: e[0]):
+            if expires_at is not None and expires_at <= now:
+                expired.append(notice.id)
+                continue
+            if subcategory and notice.subcategory != subcategory:
+                continue
+            result.append(notice)
+            if len(result) == limit:
+                break
+        for notice_id in expired:
+            self.remove(notice_id)
+
+        if len(result) < limit and any(key in self._truncated for key in keys):
+            # Entries below the cut were dropped, so the database has to fill in
+            return None
+        return result
+
+
+hot_set = HotSet(
+    min_priority=settings.HOT_SET_MIN_PRIORITY,
+    max_per_category=settings.HOT_SET_MAX_PER_CATEGORY,
+    refresh_seconds=settings.HOT_SET_REFRESH_SECONDS,
+)
+feed_state.subscribe(hot_set.on_notice_change)
@@ -0,0 +1,81 @@
+import logging
+import mailbox
+import os
+import smtplib
+from abc import ABC, abstractmethod
+from email.message import EmailMessage
+from typing import List
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MailSender(ABC):
+    """Delivers one rendered message to a list of recipients."""
+
+    @abstractmethod
+    def send(self, message: EmailMessage, recipients: List[str]) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class OutboxSender(MailSender):
+    """Stand-in for SMTP that drops each message into a local Maildir.
+
+    A message addressed to many recipients is stored once, with the envelope
+    recipients in Bcc, the way a relay would receive it. Any mail client or
+    a later relay job can pick the files up from ``new/``.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        # Creates new/, cur/ and tmp/ when the outbox doesn't exist yet
+        self._maildir = mailbox.Maildir(path, create=True)
+
+    def send(self, message: EmailMessage, recipients: List[str]) -> None:
+        stored = EmailMessage()
+        for header, value in message.items():
+            stored[header] = value
+        stored["Bcc"] = ", ".join(recipients)
+        stored.set_content(message.get_content())
+        self._maildir.add(stored)
+
+
+class SmtpSender(MailSender):
+    """Sends through an SMTP relay over one connection per run."""
+
+    def __init__(self, host: str, port: int, username=None, password=None, starttls: bool = True):
+        self._smtp = smtplib.SMTP(host, port, timeout=30)
+        if starttls:
+            self._smtp.starttls()
+        if username:
+            self._smtp.login(username, password or "")
+
+    def send(self, message: EmailMessage, recipients: List[str]) -> None:
+        refused = self._smtp.send_message(message, to_addrs=recipients)
+        if refused:
+            logger.warning("SMTP relay refused %d recipients: %s", len(refused), ", ".join(refused))
+
+    def close(self) -> None:
+        try:
+            self._smtp.quit()
+        except smtplib.SMTPException:
+            self._smtp.close()
+
+
+def get_mail_sender() -> MailSender:
+    if settings.MAIL_SENDER == "smtp":
+        return SmtpSender(
+            settings.SMTP_HOST,
+            settings.SMTP_PORT,
+            username=settings.SMTP_USERNAME,
+            password=settings.SMTP_PASSWORD,
+            starttls=settings.SMTP_STARTTLS,
+        )
+    if settings.MAIL_SENDER == "outbox":
+        return OutboxSender(settings.MAIL_OUTBOX_DIR)
+    raise ValueError(f"Unknown MAIL_SENDER {settings.MAIL_SENDER!r}")
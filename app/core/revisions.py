@@ -0,0 +1,129 @@
+"""Compact notice revision storage.
+
+The notice row always holds the latest version. When it is edited, the version
+being replaced is stored as a *reverse delta*: the edits that turn the newer
+version back into the older one. Every ``snapshot_interval``-th revision is
+stored in full instead, so rebuilding any revision never walks more than
+``snapshot_interval - 1`` deltas.
+
+Content deltas are line based: a list of ``[start, end, text]`` ops, each
+replacing ``lines[start:end]`` of the newer content with ``text``.
+"""
+import difflib
+import json
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TRACKED_FIELDS = (
+    "title",
+    "content",
+    "category",
+    "subcategory",
+    "priority",
+    "is_active",
+    "publish_at",
+    "expires_at",
+)
+
+Version = Dict[str, object]
+
+
+def snapshot_of(notice) -> Version:
+    """JSON-safe copy of the tracked fields of a notice row."""
+    version = {}
+    for field in TRACKED_FIELDS:
+        value = getattr(notice, field)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        version[field] = value
+    return version
+
+
+def make_delta(newer: Version, older: Version) -> dict:
+    """Reverse delta that rebuilds ``older`` from ``newer``."""
+    delta = {}
+    fields = {f: older[f] for f in TRACKED_FIELDS if f != "content" and older[f] != newer[f]}
+    if fields:
+        delta["f"] = fields
+    if older["content"] != newer["content"]:
+        newer_lines = newer["content"].splitlines(keepends=True)
+        older_lines = older["content"].splitlines(keepends=True)
+        matcher = difflib.SequenceMatcher(None, newer_lines, older_lines, autojunk=False)
+        delta["c"] = [
+            [i1, i2, "".join(older_lines[j1:j2])]
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+            if tag != "equal"
+        ]
+    return delta
+
+
+def apply_delta(newer: Version, delta: dict) -> Version:
+    older = dict(newer)
+    older.update(delta.get("f", {}))
+    ops = delta.get("c")
+    if ops:
+        lines = newer["content"].splitlines(keepends=True)
+        # Apply back to front so earlier indices stay valid
+        for start, end, text in reversed(ops):
+            lines[start:end] = [text] if text else []
+        older["content"] = "".join(lines)
+    return older
+
+
+def encode(payload: dict) -> str:
+    return json.dumps(payload, separators=(",", ":"))
+
+
+def build_revision(
+    before: Version, after: Version, revision: int, snapshot_interval: int
+) -> Tuple[bool, str]:
+    """Encode the replaced version ``before`` as stored revision ``revision``.
+
+    Returns ``(is_snapshot, data)``.
+    """
+    if revision % snapshot_interval == 0:
+        return True, encode(before)
+    return False, encode(make_delta(after, before))
+
+
+def reconstruct(
+    current: Version,
+    current_revision: int,
+    stored: Iterable[Tuple[int, bool, str]],
+    target: int,
+) -> Optional[Version]:
+    """Rebuild revision ``target``.
+
+    ``stored`` holds ``(revision, is_snapshot, data)`` rows for revisions
+    ``target`` up to the first snapshot at or above it, in any order; extra rows
+    are ignored. Returns None if a needed revision is missing.
+    """
+    if target == current_revision:
+        return dict(current)
+    rows = {revision: (is_snapshot, data) for revision, is_snapshot, data in stored}
+    if target not in rows:
+        return None
+
+    # Start from the nearest full version at or above the target
+    base_revision, version = current_revision, current
+    for revision in range(target, current_revision):
+        row = rows.get(revision)
+        if row is None:
+            return None
+        if row[0]:
+            base_revision, version = revision, json.loads(row[1])
+            break
+
+    for revision in range(base_revision - 1, target - 1, -1):
+        version = apply_delta(version, json.loads(rows[revision][1]))
+    return version
+
+
+def chain_bounds(target: int, current_revision: int, snapshot_interval: int) -> Tuple[int, int]:
+    """Inclusive range of stored revisions ``reconstruct`` may need for ``target``."""
+    next_snapshot = -(-target // snapshot_interval) * snapshot_interval
+    return target, min(next_snapshot, current_revision - 1)
+
+
+def storage_size(rows: List[Tuple[int, bool, str]]) -> int:
+    return sum(len(data.encode("utf-8")) for _, _, data in rows)
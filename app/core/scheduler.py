@@ -0,0 +1,174 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, update
+
+from ..database import SessionLocal
+from ..models.notice import Notice
+from ..utils.helpers import as_utc, utcnow
+from .feed import feed_state
+from .webhooks import webhook_dispatcher
+
+logger = logging.getLogger(__name__)
+
+PUBLISH = "publish"
+EXPIRE = "expire"
+RETRY_DELAY = timedelta(seconds=30)
+
+
+class NoticeScheduler:
+    """Fires notice publish/expiry events at the right moment.
+
+    Upcoming events live in a min-heap ordered by due time, so the run loop only
+    ever sleeps until the earliest one. Rescheduling a notice does not search the
+    heap: the latest due time per (kind, notice) is kept in ``_pending`` and stale
+    heap entries are dropped when they surface. The heap is rebuilt from the
+    database on startup, so nothing is lost across restarts.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self._session_factory = session_factory
+        self._heap: List[Tuple[datetime, int, str, int]] = []
+        self._pending: Dict[Tuple[str, int], datetime] = {}
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        count = await asyncio.to_thread(self._load)
+        self._wakeup = asyncio.Event()
+        logger.info("Notice scheduler loaded %d pending notices", count)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def schedule_notice(self, notice: Notice) -> None:
+        """(Re)schedule events for a notice after it was created or updated."""
+        self.unschedule(notice.id)
+        publish_at = as_utc(notice.publish_at)
+        if not notice.is_published and publish_at is not None:
+            self._push(publish_at, PUBLISH, notice.id)
+        expires_at = as_utc(notice.expires_at)
+        if expires_at is not None and expires_at > utcnow():
+            self._push(expires_at, EXPIRE, notice.id)
+
+    def unschedule(self, notice_id: int) -> None:
+        self._pending.pop((PUBLISH, notice_id), None)
+        self._pending.pop((EXPIRE, notice_id), None)
+
+    def _push(self, when: datetime, kind: str, notice_id: int) -> None:
+        self._pending[(kind, notice_id)] = when
+        heapq.heappush(self._heap, (when, next(self._seq), kind, notice_id))
+        # Only an event that became the new head can shorten the current sleep
+        if self._wakeup is not None and self._heap[0][2:] == (kind, notice_id):
+            self._wakeup.set()
+
+    def _load(self) -> int:
+        now = utcnow()
+        db = self._session_factory()
+        try:
+            notices = db.query(Notice).filter(
+                or_(
+                    and_(Notice.is_published == False, Notice.publish_at.isnot(None)),
+                    Notice.expires_at > now,
+                )
+            ).all()
+            for notice in notices:
+                self.schedule_notice(notice)
+            return len(notices)
+        finally:
+            db.close()
+
+    def _pop_due(self, now: datetime) -> List[Tuple[str, int]]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            when, _, kind, notice_id = heapq.heappop(self._heap)
+            if self._pending.get((kind, notice_id)) != when:
+                continue  # superseded by a later reschedule or unscheduled
+            del self._pending[(kind, notice_id)]
+            due.append((kind, notice_id))
+        return due
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            due = self._pop_due(utcnow())
+            if due:
+                try:
+                    notices, changed = await asyncio.to_thread(self._apply, due)
+                except Exception:
+                    logger.exception("Failed to apply scheduled notice events, retrying")
+                    retry_at = utcnow() + RETRY_DELAY
+                    for kind, notice_id in due:
+                        self._push(retry_at, kind, notice_id)
+                    continue
+                # Listeners run on the event loop, same as for request-driven writes
+                for notice in notices:
+                    feed_state.notice_changed(notice)
+                # Publishing puts a notice on the board and expiry takes it off,
+                # which is exactly what subscribers track
+                for notice in notices:
+                    if notice.id in changed:
+                        await webhook_dispatcher.visibility_event(notice, changed[notice.id])
+                continue
+
+            timeout = None
+            if self._heap:
+                timeout = max((self._heap[0][0] - utcnow()).total_seconds(), 0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _apply(self, due: List[Tuple[str, int]]) -> Tuple[List[Notice], Dict[int, bool]]:
+        """Apply due events.
+
+        Returns the notices involved and, for those that actually changed,
+        whether each was on the board before the event.
+        """
+        now = utcnow()
+        publish_ids = [notice_id for kind, notice_id in due if kind == PUBLISH]
+        notice_ids = {notice_id for _, notice_id in due}
+        changed: Dict[int, bool] = {}
+        db = self._session_factory()
+        try:
+            if publish_ids:
+                published = db.execute(
+                    update(Notice)
+                    .where(
+                        Notice.id.in_(publish_ids),
+                        Notice.is_published == False,
+                        Notice.publish_at <= now,
+                    )
+                    .values(is_published=True)
+                    .returning(Notice.id)
+                ).scalars().all()
+                # Unpublished until now, so none of these were on the board
+                changed.update(dict.fromkeys(published, False))
+                db.commit()
+            notices = db.query(Notice).filter(Notice.id.in_(notice_ids)).all()
+            db.expunge_all()
+            # Expiry needs no write; it counts once the deadline has really passed
+            for notice in notices:
+                if (EXPIRE, notice.id) in due and notice.is_expired(now):
+                    # Visible right up to the deadline unless otherwise hidden
+                    changed.setdefault(notice.id, bool(
+                        notice.is_active and notice.is_approved and notice.is_published
+                    ))
+            return notices, changed
+        finally:
+            db.close()
+
+
+notice_scheduler = NoticeScheduler()
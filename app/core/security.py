@@ -4,7 +4,13 @@ from sqlalchemy.orm import Session
 from ..database import get_db
 from ..models.user import User
 from .firebase import verify_firebase_token
+from .tenancy import normalize_campus
+from .tracing import span
+from ..config import settings
 from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
 
 security = HTTPBearer()
 
@@ -13,9 +19,11 @@ async def get_current_user(
     db: Session = Depends(get_db)
 ) -> User:
     token = credentials.credentials
-    decoded_token = await verify_firebase_token(token)
+    with span("auth.verify_token"):
+        decoded_token = await verify_firebase_token(token)
     
-    user = db.query(User).filter(User.uid == decoded_token["uid"]).first()
+    with span("auth.user_lookup"):
+        user = db.query(User).filter(User.uid == decoded_token["uid"]).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -28,6 +36,21 @@ async def get_current_user(
             detail="Inactive user"
         )
     
+    # The campus custom claim is authoritative; keep the stored row in step with it.
+    # Compare the normalized form, or a differently cased claim would write on
+    # every request
+    claim = decoded_token.get(settings.CAMPUS_CLAIM)
+    if claim:
+        try:
+            claimed_campus = normalize_campus(claim)
+        except HTTPException:
+            # A bad claim is a provisioning mistake, not the caller's; keep the stored campus
+            logger.warning("Ignoring invalid campus claim %r for user %s", claim, user.uid)
+            claimed_campus = None
+        if claimed_campus and claimed_campus != user.campus:
+            user.campus = claimed_campus
+            db.commit()
+    
     return user
 
 async def get_current_admin(
@@ -40,6 +63,17 @@ async def get_current_admin(
         )
     return current_user
 
+async def get_current_author(
+    current_user: User = Depends(get_current_user)
+) -> User:
+    # Faculty may submit notices; theirs wait in the moderation queue
+    if current_user.role not in ("admin", "faculty"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return current_user
+
 async def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
     db: Session = Depends(get_db)
@@ -49,5 +83,8 @@ async def get_current_user_optional(
     
     try:
         return await get_current_user(credentials, db)
-    except HTTPException:
+    except HTTPException as exc:
+        # Bad or unknown tokens read as anonymous; server faults must surface
+        if exc.status_code >= 500:
+            raise
         return None
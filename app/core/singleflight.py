@@ -0,0 +1,38 @@
+import asyncio
+from typing import Any, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into one execution.
+
+    The first caller for a key runs ``fn`` in a worker thread; everyone who asks
+    for the same key while it is running awaits that same result (or exception).
+    Nothing is cached once the call finishes.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.stats = {"executions": 0, "coalesced": 0}
+
+    async def do(self, key: Hashable, fn: Callable[..., Any], *args) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.stats["executions"] += 1
+        else:
+            self.stats["coalesced"] += 1
+        # Shield so one caller disconnecting doesn't cancel the shared execution
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every waiter went away
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
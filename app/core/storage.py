@@ -0,0 +1,368 @@
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+from typing import List, NamedTuple, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import HTTPException, Request, status
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.responses import JSONResponse, Response
+
+from ..config import settings
+
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+# Room for multipart boundaries and part headers around an upload's file bytes
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class StagedBlob(NamedTuple):
+    sha256: str
+    size: int
+    tmp_path: str
+
+
+class StagedUpload(NamedTuple):
+    blob: StagedBlob
+    filename: Optional[str]
+    content_type: Optional[str]
+
+
+class BlobWriter:
+    """Temporary file that hashes and counts the bytes written to it."""
+
+    def __init__(self, tmp_dir: str, max_size: int):
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        self._out = os.fdopen(fd, "wb")
+        self._digest = hashlib.sha256()
+        self.max_size = max_size
+        self.size = 0
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            raise _too_large(self.max_size)
+        self._digest.update(chunk)
+        self._out.write(chunk)
+
+    def finish(self) -> StagedBlob:
+        self._out.close()
+        return StagedBlob(self._digest.hexdigest(), self.size, self.tmp_path)
+
+    def abort(self) -> None:
+        self._out.close()
+        try:
+            os.remove(self.tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+class _FilePart:
+    """Multipart parser callbacks that keep the bytes of one named file part.
+
+    Other parts are skipped; their size is bounded by ``UploadLimitMiddleware``.
+    """
+
+    def __init__(self, field: str):
+        self.field = field.encode()
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self.complete = False
+        self._capturing = False
+        self._pending: List[bytes] = []
+        self._headers = {}
+        self._header_name = b""
+        self._header_value = b""
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+    def on_part_begin(self) -> None:
+        self._headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self._headers[self._header_name.lower()] = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._capturing = not self.complete and options.get(b"name") == self.field and b"filename" in options
+        if self._capturing:
+            self.filename = options[b"filename"].decode("utf-8", "replace") or None
+            content_type = self._headers.get(b"content-type")
+            self.content_type = content_type.decode("latin-1") if content_type else None
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._capturing:
+            self._pending.append(data[start:end])
+
+    def on_part_end(self) -> None:
+        if self._capturing:
+            self._capturing = False
+            self.complete = True
+
+    def take(self) -> bytes:
+        data = b"".join(self._pending)
+        self._pending.clear()
+        return data
+
+
+class AttachmentStorage:
+    """Content-addressed blob store on local disk.
+
+    Blobs are named by their SHA-256 and fanned out into two levels of
+    directories (``ab/cd/abcd...``), so identical uploads share one file.
+    Uploads are staged first and only placed once the caller holds the blob's
+    ``attachment_blobs`` row, the same lock garbage collection takes before
+    removing a file, so a dedup upload can't lose its blob to a concurrent
+    delete.
+    """
+
+    def __init__(self, root: str, max_size: int, chunk_size: int):
+        self.root = root
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+
+    def path_for(self, sha256: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    async def receive(self, request: Request, field: str = "file") -> StagedUpload:
+        """Stage the ``field`` file of a multipart request body as it arrives.
+
+        The body is parsed chunk by chunk and the file's bytes go straight into
+        a staging file while being hashed, so an upload is written to disk once
+        and hashing finishes as soon as the last chunk lands.
+        """
+        content_type, params = parse_options_header(request.headers.get("content-type", ""))
+        boundary = params.get(b"boundary")
+        if content_type != b"multipart/form-data" or not boundary:
+            raise HTTPException(status_code=400, detail="Expected a multipart/form-data body")
+
+        part = _FilePart(field)
+        parser = MultipartParser(boundary, part.callbacks())
+        writer = await asyncio.to_thread(BlobWriter, os.path.join(self.root, "tmp"), self.max_size)
+        try:
+            async for chunk in request.stream():
+                parser.write(chunk)
+                data = part.take()
+                if data:
+                    await asyncio.to_thread(writer.write, data)
+            parser.finalize()
+            if not part.complete:
+                raise HTTPException(status_code=400, detail=f"Missing file field '{field}'")
+            blob = await asyncio.to_thread(writer.finish)
+        except MultipartParseError:
+            writer.abort()
+            raise HTTPException(status_code=400, detail="Malformed multipart body")
+        except BaseException:
+            writer.abort()
+            raise
+        return StagedUpload(blob, part.filename, part.content_type)
+
+    def place(self, staged: StagedBlob) -> None:
+        """Move a staged upload into the store; call with the blob's row locked."""
+        target = self.path_for(staged.sha256)
+        if os.path.exists(target):
+            os.remove(staged.tmp_path)  # already stored, keep the existing blob
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(staged.tmp_path, target)
+
+    def discard(self, staged: StagedBlob) -> None:
+        try:
+            os.remove(staged.tmp_path)
+        except FileNotFoundError:
+            pass
+
+    def remove(self, sha256: str) -> None:
+        try:
+            os.remove(self.path_for(sha256))
+        except FileNotFoundError:
+            pass
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single-range ``Range`` header into an inclusive ``(start, end)``.
+
+    Returns None when the whole file should be sent (no header, or a form we
+    don't serve such as multiple ranges). Raises 416 for unsatisfiable ranges.
+    """
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if first == "" and last == "":
+        return None
+    if first == "":
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0:
+            raise _unsatisfiable(size)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise _unsatisfiable(size)
+    return start, min(end, size - 1)
+
+
+def _too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Attachment exceeds {max_size} bytes"
+    )
+
+
+def _unsatisfiable(size: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+        detail="Requested range not satisfiable",
+        headers={"Content-Range": f"bytes */{size}"}
+    )
+
+
+class BlobResponse(Response):
+    """Sends a byte range of a stored blob.
+
+    Uses the ASGI zero-copy send extension (``sendfile``) when the server
+    advertises it, and falls back to chunked reads off the event loop otherwise.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        size: int,
+        byte_range: Optional[Tuple[int, int]],
+        filename: str,
+        media_type: str,
+        etag: str,
+        chunk_size: int,
+        cache_control: str = "public, max-age=86400",
+        vary: Optional[str] = None,
+    ):
+        super().__init__(status_code=206 if byte_range else 200, media_type=media_type)
+        self.path = path
+        self.chunk_size = chunk_size
+        self.start, self.end = byte_range or (0, size - 1)
+        self.headers["content-length"] = str(max(self.end - self.start + 1, 0))
+        self.headers["accept-ranges"] = "bytes"
+        self.headers["etag"] = etag
+        self.headers["cache-control"] = cache_control
+        if vary:
+            self.headers["vary"] = vary
+        self.headers["content-disposition"] = f"attachment; filename*=UTF-8''{quote(filename)}"
+        if byte_range:
+            self.headers["content-range"] = f"bytes {self.start}-{self.end}/{size}"
+
+    async def __call__(self, scope, receive, send) -> None:
+        # Open before starting the response, so a missing blob can still get
+        # a proper error status instead of a truncated 200
+        try:
+            blob = open(self.path, "rb")
+        except FileNotFoundError:
+            response = JSONResponse({"detail": "Attachment not found"}, status_code=status.HTTP_404_NOT_FOUND)
+            return await response(scope, receive, send)
+
+        with blob:
+            await send({
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            })
+            count = self.end - self.start + 1
+            if scope.get("method") == "HEAD" or count <= 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+                return
+
+            if ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+                await send({
+                    "type": ZEROCOPY_EXTENSION,
+                    "file": blob,
+                    "offset": self.start,
+                    "count": count,
+                    "more_body": False,
+                })
+                return
+
+            blob.seek(self.start)
+            remaining = count
+            while remaining > 0:
+                chunk = await asyncio.to_thread(blob.read, min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # File shrank underneath us; close the response cleanly
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class UploadLimitMiddleware:
+    """Rejects oversized attachment uploads before their bodies are read.
+
+    A declared Content-Length over the limit is refused straight away; bodies
+    without one are counted as they arrive and cut off once they pass it. The
+    store still enforces the exact file size while staging.
+    """
+
+    def __init__(self, app, path: re.Pattern, max_size: int):
+        self.app = app
+        self.path = path
+        self.max_size = max_size
+        self.max_body = max_size + MULTIPART_OVERHEAD
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not self.path.match(scope["path"]):
+            return await self.app(scope, receive, send)
+
+        for key, value in scope["headers"]:
+            if key == b"content-length":
+                if value.isdigit() and int(value) > self.max_body:
+                    error = _too_large(self.max_size)
+                    response = JSONResponse({"detail": error.detail}, status_code=error.status_code)
+                    return await response(scope, receive, send)
+                break
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body:
+                    # Raised from the endpoint's read of the body, so it
+                    # surfaces as a normal 413 response
+                    raise _too_large(self.max_size)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+attachment_storage = AttachmentStorage(
+    root=settings.ATTACHMENTS_DIR,
+    max_size=settings.MAX_ATTACHMENT_SIZE,
+    chunk_size=settings.ATTACHMENT_CHUNK_SIZE,
+)
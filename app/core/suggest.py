@@ -0,0 +1,328 @@
+import asyncio
+import logging
+from bisect import bisect_left, insort
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.notice import Notice
+from ..utils.helpers import as_utc, utcnow
+from .feed import feed_state
+
+logger = logging.getLogger(__name__)
+
+TITLE = "title"
+SUBCATEGORY = "subcategory"
+
+# Only the first few words of a title start a searchable suffix
+MAX_SUFFIX_WORDS = 8
+# Sorts after any character a normalized term can contain, so
+# (campus, prefix + PREFIX_END) bounds every term starting with the prefix
+PREFIX_END = "\U0010ffff"
+
+# Prefixes up to this long get their top list built with the index: they
+# match the most terms, so they are the ones a scan would make slow
+EAGER_PREFIX_LENGTH = 3
+# Candidates kept per prefix list, twice the largest limit the suggest
+# endpoint accepts so removals rarely run it short
+BUCKET_CAPACITY = 50
+# Prefix lists kept at most; the least recently used are recomputed on demand
+MAX_BUCKETS = 50_000
+
+Entry = Tuple[str, str, str, int]  # (campus, term, kind, notice_id)
+Candidate = Tuple[Tuple[int, float], str, int]  # (rank, kind, notice_id)
+BucketKey = Tuple[str, Optional[str], str]  # (campus, category or None for all, prefix)
+
+
+@dataclass
+class _Bucket:
+    """Best candidates for one prefix, highest rank first.
+
+    Already collapsed like the results: one candidate per title notice and one
+    (the best notice's) per subcategory.
+    """
+    candidates: List[Candidate]
+    complete: bool  # holds every match, not just the best BUCKET_CAPACITY
+
+
+@dataclass(frozen=True)
+class _NoticeMeta:
+    title: str
+    category: str
+    subcategory: Optional[str]
+    priority: int
+    created_at: float
+    expires_at: Optional[datetime]
+
+    @property
+    def rank(self) -> Tuple[int, float]:
+        return self.priority, self.created_at
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _terms(text: str) -> List[str]:
+    """Every word-suffix of ``text``, so "sched" completes "Exam schedule"."""
+    words = normalize(text).split()
+    return [" ".join(words[i:]) for i in range(min(len(words), MAX_SUFFIX_WORDS))]
+
+
+class SuggestIndex:
+    """In-memory prefix index over visible notice titles and subcategories.
+
+    Terms are kept in one sorted list keyed by (campus, term), so the matches
+    for a prefix are one contiguous slice found with two bisects, and one
+    campus's terms never crowd out another's. Matches are ranked by
+    (priority, created_at) like the feed itself.
+
+    Lookups don't rank the slice each time: every (campus, category, prefix)
+    has a bucket with its best candidates, so a lookup reads at most
+    BUCKET_CAPACITY entries however many terms match. Buckets for short
+    prefixes are built with the index; longer ones are filled from the slice
+    on first use and cached. Writes keep cached buckets in step; a bucket that
+    removals leave too short is refilled on its next lookup.
+    """
+
+    def __init__(self, session_factory=SessionLocal, refresh_seconds: int = 300):
+        self._session_factory = session_factory
+        self.refresh_seconds = refresh_seconds
+        self._entries: List[Entry] = []
+        self._by_notice: Dict[int, List[Entry]] = {}
+        self._meta: Dict[int, _NoticeMeta] = {}
+        self._buckets: "OrderedDict[BucketKey, _Bucket]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, build_now: bool = True) -> None:
+        # With build_now=False the first build runs in the background and
+        # lookups return nothing until it lands
+        if build_now:
+            await self.rebuild()
+        self._task = asyncio.create_task(self._refresh_loop(build_first=not build_now))
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def rebuild(self) -> None:
+        fresh = await asyncio.to_thread(self._build)
+        # Swap in one step so lookups never see a half-built index
+        self._entries, self._by_notice, self._meta, self._buckets = (
+            fresh._entries, fresh._by_notice, fresh._meta, fresh._buckets
+        )
+        logger.info(
+            "Suggest index built with %d terms for %d notices, %d prefix lists",
+            len(self._entries), len(self._meta), len(self._buckets),
+        )
+
+    async def _refresh_loop(self, build_first: bool = False) -> None:
+        # Other workers write too; a periodic rebuild picks up their changes
+        while True:
+            if not build_first:
+                await asyncio.sleep(self.refresh_seconds)
+            build_first = False
+            try:
+                await self.rebuild()
+            except Exception:
+                logger.exception("Suggest index refresh failed")
+
+    def _build(self) -> "SuggestIndex":
+        fresh = SuggestIndex(self._session_factory, self.refresh_seconds)
+        now = utcnow()
+        db = self._session_factory()
+        try:
+            notices = db.query(Notice).filter(
+                Notice.is_active == True, Notice.is_approved == True, Notice.is_published == True
+            ).all()
+            entries = []
+            for notice in notices:
+                if notice.is_visible(now):
+                    entries.extend(fresh._register(notice))
+            entries.sort()
+            fresh._entries = entries
+        finally:
+            db.close()
+        fresh._fill_short_buckets()
+        return fresh
+
+    def _fill_short_buckets(self) -> None:
+        """Buckets for every prefix up to EAGER_PREFIX_LENGTH, in one pass over the terms."""
+        found: Dict[BucketKey, Dict[object, Candidate]] = defaultdict(dict)
+        for campus, term, kind, notice_id in self._entries:
+            meta = self._meta[notice_id]
+            candidate = (meta.rank, kind, notice_id)
+            collapse_key = self._collapse_key(kind, notice_id)
+            for length in range(1, min(len(term), EAGER_PREFIX_LENGTH) + 1):
+                for category in (None, meta.category):
+                    _offer(found[(campus, category, term[:length])], collapse_key, candidate)
+        for key, candidates in found.items():
+            self._buckets[key] = _bucket_of(candidates.values())
+
+    def _collapse_key(self, kind: str, notice_id: int):
+        # One suggestion per title notice; subcategories collapse across notices
+        return notice_id if kind == TITLE else (SUBCATEGORY, self._meta[notice_id].subcategory)
+
+    def _touched_buckets(self, entries: List[Entry], category: str):
+        """Cached buckets whose prefix starts any of ``entries``' terms, with the entry."""
+        for entry in entries:
+            campus, term = entry[0], entry[1]
+            for length in range(1, len(term) + 1):
+                for key in ((campus, None, term[:length]), (campus, category, term[:length])):
+                    bucket = self._buckets.get(key)
+                    if bucket is not None:
+                        yield key, bucket, entry
+
+    def _register(self, notice: Notice) -> List[Entry]:
+        created_at = as_utc(notice.created_at)
+        self._meta[notice.id] = _NoticeMeta(
+            title=notice.title,
+            category=notice.category,
+            subcategory=notice.subcategory,
+            priority=notice.priority or 0,
+            created_at=created_at.timestamp() if created_at else 0.0,
+            expires_at=as_utc(notice.expires_at),
+        )
+        campus = notice.campus
+        entries = {(campus, term, TITLE, notice.id) for term in _terms(notice.title)}
+        if notice.subcategory:
+            entries.update((campus, term, SUBCATEGORY, notice.id) for term in _terms(notice.subcategory))
+        self._by_notice[notice.id] = list(entries)
+        return self._by_notice[notice.id]
+
+    def upsert(self, notice: Notice) -> None:
+        self.remove(notice.id)
+        if not notice.is_visible(utcnow()):
+            return
+        entries = self._register(notice)
+        for entry in entries:
+            insort(self._entries, entry)
+        rank = self._meta[notice.id].rank
+        for _, bucket, entry in self._touched_buckets(entries, notice.category):
+            kind = entry[2]
+            self._offer_to_bucket(bucket, self._collapse_key(kind, notice.id), (rank, kind, notice.id))
+
+    def _offer_to_bucket(self, bucket: _Bucket, collapse_key, candidate: Candidate) -> None:
+        candidates = bucket.candidates
+        for index, existing in enumerate(candidates):
+            if self._collapse_key(existing[1], existing[2]) == collapse_key:
+                if existing >= candidate:
+                    return  # same notice via another term, or a better one for the subcategory
+                del candidates[index]
+                break
+        else:
+            if not bucket.complete and candidate < candidates[-1]:
+                return  # below the cut, where the bucket doesn't need to be exact
+        candidates.append(candidate)
+        candidates.sort(reverse=True)
+        if len(candidates) > BUCKET_CAPACITY:
+            candidates.pop()
+            bucket.complete = False
+
+    def remove(self, notice_id: int) -> None:
+        entries = self._by_notice.pop(notice_id, ())
+        meta = self._meta.get(notice_id)
+        if meta is not None:
+            for key, bucket, _ in list(self._touched_buckets(entries, meta.category)):
+                kept = [c for c in bucket.candidates if c[2] != notice_id]
+                if len(kept) == len(bucket.candidates):
+                    continue
+                if any(c[2] == notice_id and c[1] == SUBCATEGORY for c in bucket.candidates) or (
+                    not bucket.complete and len(kept) < BUCKET_CAPACITY // 2
+                ):
+                    # The subcategory's next best notice, or the entries below
+                    # the cut, aren't in the bucket: refill it on next use
+                    self._buckets.pop(key, None)
+                else:
+                    bucket.candidates = kept
+        for entry in entries:
+            index = bisect_left(self._entries, entry)
+            if index < len(self._entries) and self._entries[index] == entry:
+                del self._entries[index]
+        self._meta.pop(notice_id, None)
+
+    def on_notice_change(self, notice_id: int, notice: Optional[Notice]) -> None:
+        if notice is None:
+            self.remove(notice_id)
+        else:
+            self.upsert(notice)
+
+    def _scan(self, campus: str, prefix: str, category: Optional[str]) -> _Bucket:
+        """Build a prefix's bucket from every matching term."""
+        meta_by_id = self._meta
+        found: Dict[object, Candidate] = {}
+        start = bisect_left(self._entries, (campus, prefix))
+        end = bisect_left(self._entries, (campus, prefix + PREFIX_END), start)
+        for index in range(start, end):
+            _, _, kind, notice_id = self._entries[index]
+            meta = meta_by_id[notice_id]
+            if category and meta.category != category:
+                continue
+            _offer(found, self._collapse_key(kind, notice_id), (meta.rank, kind, notice_id))
+        return _bucket_of(found.values())
+
+    def _bucket(self, campus: str, prefix: str, category: Optional[str], refresh: bool = False) -> _Bucket:
+        key = (campus, category, prefix)
+        bucket = None if refresh else self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = self._scan(campus, prefix, category)
+            if len(self._buckets) > MAX_BUCKETS:
+                self._buckets.popitem(last=False)
+        self._buckets.move_to_end(key)
+        return bucket
+
+    def suggest(self, campus: str, prefix: str, limit: int = 10, category: Optional[str] = None) -> List[dict]:
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        now = utcnow()
+        bucket = self._bucket(campus, prefix, category)
+        ranked = self._pick(bucket, limit, now)
+        if len(ranked) < limit and not bucket.complete:
+            # Expired entries used up the bucket
+            ranked = self._pick(self._bucket(campus, prefix, category, refresh=True), limit, now)
+
+        suggestions = []
+        for kind, notice_id in ranked:
+            meta = self._meta[notice_id]
+            suggestions.append({
+                "text": meta.title if kind == TITLE else meta.subcategory,
+                "kind": kind,
+                "notice_id": notice_id if kind == TITLE else None,
+                "category": meta.category,
+            })
+        return suggestions
+
+    def _pick(self, bucket: _Bucket, limit: int, now: datetime) -> List[Tuple[str, int]]:
+        picked = []
+        for _, kind, notice_id in bucket.candidates:
+            expires_at = self._meta[notice_id].expires_at
+            if expires_at is not None and expires_at <= now:
+                continue
+            picked.append((kind, notice_id))
+            if len(picked) == limit:
+                break
+        return picked
+
+
+def _offer(found: Dict[object, Candidate], collapse_key, candidate: Candidate) -> None:
+    current = found.get(collapse_key)
+    if current is None or candidate > current:
+        found[collapse_key] = candidate
+
+
+def _bucket_of(candidates) -> _Bucket:
+    ranked = sorted(candidates, reverse=True)
+    return _Bucket(ranked[:BUCKET_CAPACITY], complete=len(ranked) <= BUCKET_CAPACITY)
+
+
+suggest_index = SuggestIndex(refresh_seconds=settings.SUGGEST_REFRESH_SECONDS)
+feed_state.subscribe(suggest_index.on_notice_change)
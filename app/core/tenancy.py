@@ -0,0 +1,40 @@
+import re
+from typing import Optional
+
+from fastapi import Header, HTTPException, Query, status
+
+from ..config import settings
+
+CAMPUS_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_-]{0,49}$")
+# Request header that selects the campus for reads; cacheable
+# responses list it in Vary
+CAMPUS_HEADER = "X-Campus"
+
+
+def normalize_campus(value: Optional[str]) -> str:
+    """Validate a campus key, falling back to the default campus when empty."""
+    campus = (value or "").strip().lower() or settings.DEFAULT_CAMPUS
+    if not CAMPUS_PATTERN.match(campus):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid campus"
+        )
+    if settings.CAMPUSES and campus not in settings.CAMPUSES:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Unknown campus"
+        )
+    return campus
+
+
+async def get_request_campus(
+    campus: Optional[str] = Query(None, description="Campus to read from"),
+    x_campus: Optional[str] = Header(None)
+) -> str:
+    """Campus for reads, from ?campus= or the X-Campus header.
+
+    Every read route resolves its campus here, signed in or not, so a listing
+    and the notices it links to always come from the same campus.
+    """
+    return normalize_campus(campus or x_campus)
+
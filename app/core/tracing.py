@@ -0,0 +1,339 @@
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+
+from fastapi.routing import APIRoute
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Longest SQL text kept on a span; statements are recorded without parameters
+MAX_STATEMENT_LENGTH = 300
+
+
+class Span:
+    __slots__ = ("span_id", "parent_id", "name", "start", "end", "attributes")
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Optional[dict] = None):
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.time_ns()
+        self.end: Optional[int] = None
+        self.attributes = attributes or {}
+
+
+class Trace:
+    """Spans collected for one sampled request."""
+
+    def __init__(self, trace_id: Optional[str] = None, parent_id: Optional[str] = None):
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.spans: List[Span] = []
+        self.root = self.open("request", parent_id)
+        # Set by the traced endpoint wrapper so the middleware can tell
+        # dependency resolution and serialization apart from the handler
+        self.handler_start: Optional[int] = None
+        self.handler_end: Optional[int] = None
+
+    def open(self, name: str, parent_id: Optional[str], attributes: Optional[dict] = None) -> Span:
+        span = Span(name, parent_id, attributes)
+        # list.append is atomic, so spans from worker threads can land here too
+        self.spans.append(span)
+        return span
+
+    def add(self, name: str, parent_id: str, start: int, end: int, attributes: Optional[dict] = None) -> None:
+        span = self.open(name, parent_id, attributes)
+        span.start, span.end = start, end
+
+
+_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("trace", default=None)
+_span_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("span_id", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _trace.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a block as a child of the current span. A no-op outside sampled requests."""
+    trace = _trace.get()
+    if trace is None:
+        yield None
+        return
+    current = trace.open(name, _span_id.get(), attributes)
+    token = _span_id.set(current.span_id)
+    try:
+        yield current
+    except BaseException as exc:
+        current.attributes["error"] = type(exc).__name__
+        raise
+    finally:
+        current.end = time.time_ns()
+        _span_id.reset(token)
+
+
+def parse_traceparent(value: Optional[str]):
+    """(trace_id, parent_span_id, sampled) from a W3C traceparent header, or None."""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        flags = int(parts[3], 16)
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+def _jsonl_record(trace: Trace) -> dict:
+    return {
+        "trace_id": trace.trace_id,
+        "spans": [
+            {
+                "span_id": s.span_id,
+                "parent_id": s.parent_id,
+                "name": s.name,
+                "start_ns": s.start,
+                "duration_ms": round(((s.end or s.start) - s.start) / 1e6, 3),
+                "attributes": s.attributes,
+            }
+            for s in trace.spans
+        ],
+    }
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_record(trace: Trace) -> dict:
+    """One ExportTraceServiceRequest in OTLP/JSON, as read by the collector's file receiver."""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": settings.TRACE_SERVICE_NAME}},
+            ]},
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": [
+                    {
+                        "traceId": trace.trace_id,
+                        "spanId": s.span_id,
+                        "parentSpanId": s.parent_id or "",
+                        "name": s.name,
+                        "kind": 2 if s is trace.root else 1,  # SERVER / INTERNAL
+                        "startTimeUnixNano": str(s.start),
+                        "endTimeUnixNano": str(s.end or s.start),
+                        "attributes": [
+                            {"key": key, "value": _otlp_value(value)} for key, value in s.attributes.items()
+                        ],
+                    }
+                    for s in trace.spans
+                ],
+            }],
+        }],
+    }
+
+
+class Tracer:
+    """Samples requests, collects their spans and writes finished traces to disk.
+
+    Export goes through a QueueHandler, so the request only pays for building
+    the record; a listener thread does the file writes and a rotating handler
+    keeps the sink bounded. With a sample rate of 0 requests skip tracing
+    entirely and span helpers return immediately, whatever clients send. An
+    incoming traceparent's trace id is always continued, but its sampled flag
+    is only followed when ``trust_upstream`` is set; otherwise any client could
+    force tracing on every request it makes.
+    """
+
+    def __init__(
+        self, sample_rate: float, path: str, export_format: str, max_bytes: int, backup_count: int,
+        trust_upstream: bool = False,
+    ):
+        self.sample_rate = sample_rate
+        self.trust_upstream = trust_upstream
+        self.path = path
+        self.export_format = export_format
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._sink = logging.getLogger(f"{__name__}.sink")
+        self._sink.propagate = False
+        self._sink.setLevel(logging.INFO)
+        self._sink.addHandler(logging.handlers.QueueHandler(self._queue))
+        self.stats = {"sampled": 0, "exported": 0, "export_errors": 0}
+
+    def start(self) -> None:
+        if self._listener:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(
+            self.path, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._listener = logging.handlers.QueueListener(self._queue, handler)
+        self._listener.start()
+
+    def stop(self) -> None:
+        if self._listener:
+            # Drains whatever is still queued before closing the file
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+            self._listener = None
+
+    def should_sample(self, upstream_sampled: Optional[bool] = None) -> bool:
+        if self.sample_rate <= 0:
+            return False
+        if upstream_sampled is not None and self.trust_upstream:
+            return upstream_sampled
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def export(self, trace: Trace) -> None:
+        if self._listener is None:
+            # Not started (scripts, shell): nothing would drain the queue
+            return
+        try:
+            record = _otlp_record(trace) if self.export_format == "otlp" else _jsonl_record(trace)
+            self._sink.info(json.dumps(record, default=str, separators=(",", ":")))
+            self.stats["exported"] += 1
+        except Exception:
+            self.stats["export_errors"] += 1
+            logger.exception("Failed to export trace %s", trace.trace_id)
+
+    def instrument_engine(self, engine) -> None:
+        """Record a span per SQL statement executed inside a sampled request."""
+        from sqlalchemy import event
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            if _trace.get() is not None:
+                conn.info.setdefault("trace_query_start", []).append(time.time_ns())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            trace = _trace.get()
+            if trace is None:
+                return
+            starts = conn.info.get("trace_query_start")
+            if not starts:
+                return
+            trace.add(
+                "sql", _span_id.get(), starts.pop(), time.time_ns(),
+                {"db.statement": " ".join(statement.split())[:MAX_STATEMENT_LENGTH], "db.rowcount": cursor.rowcount},
+            )
+
+    def instrument_routes(self, app) -> None:
+        """Wrap each route's endpoint so handler time is split from what surrounds it.
+
+        Only the endpoint itself is wrapped. Dependency callables are left alone
+        because ``app.dependency_overrides`` looks them up by identity.
+        """
+        for route in app.routes:
+            if isinstance(route, APIRoute):
+                _wrap_endpoint(route.dependant)
+
+
+def _wrap_endpoint(dependant) -> None:
+    call = dependant.call
+    if getattr(call, "__traced__", False) or not inspect.iscoroutinefunction(call):
+        return
+
+    @functools.wraps(call)
+    async def traced_endpoint(*args, **kwargs):
+        trace = _trace.get()
+        if trace is None:
+            return await call(*args, **kwargs)
+        trace.handler_start = time.time_ns()
+        try:
+            with span("handler", endpoint=call.__name__):
+                return await call(*args, **kwargs)
+        finally:
+            trace.handler_end = time.time_ns()
+
+    traced_endpoint.__traced__ = True
+    dependant.call = traced_endpoint
+
+
+class TracingMiddleware:
+    """ASGI middleware that opens the request span and exports it when the response is done."""
+
+    def __init__(self, app, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        upstream = None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                upstream = parse_traceparent(value.decode("latin-1"))
+                break
+        if not self.tracer.should_sample(upstream[2] if upstream else None):
+            return await self.app(scope, receive, send)
+
+        trace = Trace(*upstream[:2]) if upstream else Trace()
+        root = trace.root
+        root.attributes.update({"http.method": scope["method"], "http.target": scope["path"]})
+        self.tracer.stats["sampled"] += 1
+        trace_token = _trace.set(trace)
+        span_token = _span_id.set(root.span_id)
+
+        async def traced_send(message):
+            if message["type"] == "http.response.start":
+                root.attributes["http.status_code"] = message["status"]
+                if trace.handler_end is not None:
+                    # Response model validation and JSON encoding happen between
+                    # the handler returning and the response starting
+                    trace.add("serialization", root.span_id, trace.handler_end, time.time_ns())
+                headers = list(message.get("headers", []))
+                headers.append((b"x-trace-id", trace.trace_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, traced_send)
+        finally:
+            root.end = time.time_ns()
+            if trace.handler_start is not None:
+                # Everything between the request arriving and the endpoint
+                # running: routing, body parsing and dependency resolution
+                trace.add("dependencies", root.span_id, root.start, trace.handler_start)
+            _span_id.reset(span_token)
+            _trace.reset(trace_token)
+            self.tracer.export(trace)
+
+
+tracer = Tracer(
+    sample_rate=settings.TRACE_SAMPLE_RATE,
+    path=settings.TRACE_FILE,
+    export_format=settings.TRACE_EXPORT_FORMAT,
+    max_bytes=settings.TRACE_MAX_BYTES,
+    backup_count=settings.TRACE_BACKUP_COUNT,
+    trust_upstream=settings.TRACE_TRUST_UPSTREAM,
+)
@@ -0,0 +1,371 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import random
+import time
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, List, Optional, Set
+
+import httpx
+from sqlalchemy import insert, select, update
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.webhook import WebhookDelivery, WebhookSubscription
+from ..schemas.notice import Notice as NoticeSchema
+from ..utils.helpers import utcnow
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "X-Notice-Board-Signature"
+# Longest error text kept on a delivery row
+MAX_ERROR_LENGTH = 500
+# Tries at persisting a batch of queued events before it is dropped
+WRITE_ATTEMPTS = 3
+
+
+def sign(secret: str, timestamp: int, body: bytes) -> str:
+    """Signature header value: HMAC-SHA256 over "<timestamp>.<body>"."""
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+def verify_signature(secret: str, header: str, body: bytes, tolerance: int = 300) -> bool:
+    """Receiver-side check, also used by the local stand-in receiver."""
+    try:
+        parts = dict(item.split("=", 1) for item in header.split(","))
+        timestamp = int(parts["t"])
+    except (KeyError, ValueError):
+        return False
+    if abs(time.time() - timestamp) > tolerance:
+        return False
+    return hmac.compare_digest(sign(secret, timestamp, body), header)
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Exponential backoff with jitter so failed endpoints aren't retried in lockstep."""
+    delay = min(settings.WEBHOOK_BACKOFF_MAX, settings.WEBHOOK_BACKOFF_BASE * 2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+class WebhookDispatcher:
+    """Delivers notice events to subscriber endpoints without touching request latency.
+
+    Events follow the public board rather than raw writes: ``notice.created``
+    when a notice appears (created visible, approved or published),
+    ``notice.updated`` when a visible notice changes and ``notice.deleted``
+    when one leaves the board. Drafts, pending, rejected and scheduled notices
+    are never sent, so embargoed content can't reach subscribers early.
+
+    Handlers only enqueue the event in memory. A writer task turns queued
+    events into one ``webhook_deliveries`` row per matching subscription, and
+    that table is the retry queue: rows survive restarts and are deleted once
+    delivered. A delivery task claims due rows with a short lease (SKIP LOCKED
+    on PostgreSQL, so several workers can share the queue) and starts one send
+    task per subscription, which POSTs its rows as signed batches. Up to
+    WEBHOOK_CONCURRENCY send tasks run at once over one pooled HTTP client, and
+    claiming continues for other subscriptions whenever a slot is free, so a
+    slow endpoint only holds its own slot. Failures are rescheduled with
+    exponential backoff until WEBHOOK_MAX_ATTEMPTS, after which the row is
+    kept as a dead letter with its last error.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self._session_factory = session_factory
+        self._queue: Optional[asyncio.Queue] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._tasks: List[asyncio.Task] = []
+        self._sending: Dict[int, asyncio.Task] = {}  # subscription id -> its send task
+        self.stats = {
+            "enqueued": 0, "persisted": 0, "dropped": 0,
+            "delivered": 0, "batches": 0, "failed_attempts": 0, "dead": 0,
+        }
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=settings.WEBHOOK_QUEUE_SIZE)
+        self._wakeup = asyncio.Event()
+        self._client = httpx.AsyncClient(
+            timeout=settings.WEBHOOK_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.WEBHOOK_CONCURRENCY,
+                max_keepalive_connections=settings.WEBHOOK_CONCURRENCY,
+            ),
+            headers={"User-Agent": f"{settings.PROJECT_NAME} webhooks"},
+        )
+        self._tasks = [asyncio.create_task(self._run_writer()), asyncio.create_task(self._run_delivery())]
+
+    async def stop(self) -> None:
+        if not self._tasks:
+            return
+        # Persist what is still queued; undelivered rows are picked up after restart
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=10)
+        except asyncio.TimeoutError:
+            logger.warning("Webhook dispatcher shut down with %d unpersisted events", self._queue.qsize())
+        # In-flight sends are abandoned; their leases run out and the rows are retried
+        tasks = self._tasks + list(self._sending.values())
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self._sending = {}
+        await self._client.aclose()
+        self._client = None
+        self._queue = None
+
+    async def notice_event(self, event: str, notice=None, *, campus: str = None, notice_id: int = None) -> None:
+        """Queue ``event`` for the notice's campus. Deletes pass campus/notice_id instead of a row."""
+        if notice is not None:
+            campus = notice.campus
+            data = NoticeSchema.model_validate(notice).model_dump(mode="json")
+        else:
+            data = {"id": notice_id, "campus": campus}
+        item = {"campus": campus, "event": event, "data": data, "occurred_at": utcnow().isoformat()}
+        self.stats["enqueued"] += 1
+        if self._queue is None:
+            # Not running inside the app (scripts, shell): persist straight away
+            await asyncio.to_thread(self._persist, [item])
+            return
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # Only waits on our own database writes, never on a subscriber
+            await self._queue.put(item)
+
+    async def visibility_event(self, notice, was_visible: bool) -> None:
+        """Queue the event for a write to ``notice``, given whether it was on the board before."""
+        if notice.is_visible(utcnow()):
+            await self.notice_event("notice.updated" if was_visible else "notice.created", notice)
+        elif was_visible:
+            await self.notice_event("notice.deleted", campus=notice.campus, notice_id=notice.id)
+
+    def notify(self) -> None:
+        """Wake the delivery loop, e.g. after re-enabling a subscription."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    # Writer: queued events -> delivery rows
+
+    async def _run_writer(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < settings.WEBHOOK_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: List[dict]) -> None:
+        # Same policy as the audit log: a brief database outage shouldn't lose events
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            try:
+                if await asyncio.to_thread(self._persist, batch):
+                    self._wakeup.set()
+                return
+            except Exception:
+                logger.exception("Webhook batch write failed (attempt %d/%d)", attempt, WRITE_ATTEMPTS)
+                await asyncio.sleep(attempt)
+        self.stats["dropped"] += len(batch)
+
+    def _persist(self, batch: List[dict]) -> int:
+        db = self._session_factory()
+        try:
+            campuses = {item["campus"] for item in batch}
+            subscriptions = db.query(
+                WebhookSubscription.id, WebhookSubscription.campus, WebhookSubscription.events
+            ).filter(WebhookSubscription.campus.in_(campuses), WebhookSubscription.is_active == True).all()
+            if not subscriptions:
+                return 0
+
+            by_campus = defaultdict(list)
+            for sub_id, campus, events in subscriptions:
+                by_campus[campus].append((sub_id, set(events.split(","))))
+            now = utcnow()
+            rows = []
+            for item in batch:
+                payload = json.dumps(
+                    {"event": item["event"], "occurred_at": item["occurred_at"], "data": item["data"]},
+                    separators=(",", ":"),
+                )
+                for sub_id, events in by_campus.get(item["campus"], ()):
+                    if item["event"] in events:
+                        rows.append({
+                            "subscription_id": sub_id, "event": item["event"], "payload": payload,
+                            "attempts": 0, "next_attempt_at": now, "created_at": now,
+                        })
+            if rows:
+                db.execute(insert(WebhookDelivery), rows)
+                db.commit()
+            self.stats["persisted"] += len(rows)
+            return len(rows)
+        finally:
+            db.close()
+
+    # Delivery: due rows -> signed batched POSTs
+
+    async def _run_delivery(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.WEBHOOK_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.dispatch_due()
+            except Exception:
+                logger.exception("Webhook delivery pass failed")
+
+    async def dispatch_due(self) -> int:
+        """Claim due rows for idle subscriptions and start their sends; returns rows claimed.
+
+        Doesn't wait for the sends: each finishing send frees its slot and
+        wakes the loop, which claims again.
+        """
+        claimed_total = 0
+        while True:
+            free = settings.WEBHOOK_CONCURRENCY - len(self._sending)
+            if free <= 0:
+                return claimed_total
+            claimed, subscriptions = await asyncio.to_thread(
+                self._claim, free * settings.WEBHOOK_BATCH_SIZE, set(self._sending)
+            )
+            if not claimed:
+                return claimed_total
+            claimed_total += len(claimed)
+            groups = defaultdict(list)
+            for row in claimed:
+                groups[row.subscription_id].append(row)
+            for sub_id, rows in groups.items():
+                task = asyncio.create_task(self._send_all(subscriptions[sub_id], rows))
+                self._sending[sub_id] = task
+                task.add_done_callback(lambda task, sub_id=sub_id: self._send_done(sub_id, task))
+
+    def _send_done(self, sub_id: int, task: asyncio.Task) -> None:
+        self._sending.pop(sub_id, None)
+        if not task.cancelled() and task.exception():
+            logger.error("Webhook send task failed", exc_info=task.exception())
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _send_all(self, subscription: dict, rows) -> int:
+        """One subscription's claimed rows, in batches, one after another."""
+        delivered = 0
+        size = settings.WEBHOOK_BATCH_SIZE
+        for start in range(0, len(rows), size):
+            delivered += await self._send_batch(subscription, rows[start:start + size])
+        return delivered
+
+    def _claim(self, limit: int, busy: Set[int]):
+        """Lease up to ``limit`` due rows to this worker by pushing their next attempt out.
+
+        Rows of subscriptions in ``busy`` (already sending here) are left for later.
+        """
+        now = utcnow()
+        db = self._session_factory()
+        try:
+            due = (
+                select(WebhookDelivery.id)
+                .join(WebhookSubscription, WebhookSubscription.id == WebhookDelivery.subscription_id)
+                .where(
+                    WebhookDelivery.next_attempt_at <= now,
+                    WebhookSubscription.is_active == True,
+                    WebhookDelivery.subscription_id.notin_(busy),
+                )
+                .order_by(WebhookDelivery.next_attempt_at, WebhookDelivery.id)
+                .limit(limit)
+                .with_for_update(skip_locked=True, of=WebhookDelivery)
+            )
+            claimed = db.execute(
+                update(WebhookDelivery)
+                .where(WebhookDelivery.id.in_(due))
+                .values(
+                    attempts=WebhookDelivery.attempts + 1,
+                    next_attempt_at=now + timedelta(seconds=settings.WEBHOOK_LEASE_SECONDS),
+                )
+                .returning(
+                    WebhookDelivery.id, WebhookDelivery.subscription_id, WebhookDelivery.event,
+                    WebhookDelivery.payload, WebhookDelivery.attempts,
+                ),
+                execution_options={"synchronize_session": False},
+            ).all()
+            subscriptions: Dict[int, dict] = {}
+            if claimed:
+                ids = {row.subscription_id for row in claimed}
+                for sub in db.query(WebhookSubscription).filter(WebhookSubscription.id.in_(ids)):
+                    subscriptions[sub.id] = {"id": sub.id, "url": sub.url, "secret": sub.secret}
+            db.commit()
+            return sorted(claimed, key=lambda row: row.id), subscriptions
+        finally:
+            db.close()
+
+    async def _send_batch(self, subscription: dict, rows) -> int:
+        events = []
+        for row in rows:
+            event = json.loads(row.payload)
+            event["id"] = row.id
+            events.append(event)
+        body = json.dumps({"events": events}, separators=(",", ":")).encode()
+        headers = {
+            "Content-Type": "application/json",
+            SIGNATURE_HEADER: sign(subscription["secret"], int(time.time()), body),
+        }
+        error = None
+        try:
+            response = await self._client.post(subscription["url"], content=body, headers=headers)
+            if not 200 <= response.status_code < 300:
+                error = f"HTTP {response.status_code}"
+        except httpx.HTTPError as exc:
+            error = f"{type(exc).__name__}: {exc}"
+
+        await asyncio.to_thread(self._settle, subscription["id"], rows, error)
+        self.stats["batches"] += 1
+        if error:
+            self.stats["failed_attempts"] += len(rows)
+            logger.warning("Webhook delivery to %s failed: %s", subscription["url"], error)
+            return 0
+        self.stats["delivered"] += len(rows)
+        return len(rows)
+
+    def _settle(self, subscription_id: int, rows, error: Optional[str]) -> None:
+        now = utcnow()
+        db = self._session_factory()
+        try:
+            ids = [row.id for row in rows]
+            if error is None:
+                db.query(WebhookDelivery).filter(WebhookDelivery.id.in_(ids)).delete(synchronize_session=False)
+                db.query(WebhookSubscription).filter(WebhookSubscription.id == subscription_id).update(
+                    {"last_delivery_at": now, "last_error": None}, synchronize_session=False
+                )
+            else:
+                error = error[:MAX_ERROR_LENGTH]
+                updates = []
+                for row in rows:
+                    if row.attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+                        next_attempt_at = None
+                        self.stats["dead"] += 1
+                    else:
+                        next_attempt_at = now + timedelta(seconds=backoff_seconds(row.attempts))
+                    updates.append({"id": row.id, "next_attempt_at": next_attempt_at, "last_error": error})
+                db.execute(update(WebhookDelivery), updates)
+                db.query(WebhookSubscription).filter(WebhookSubscription.id == subscription_id).update(
+                    {"last_error": error}, synchronize_session=False
+                )
+            db.commit()
+        finally:
+            db.close()
+
+
+webhook_dispatcher = WebhookDispatcher()
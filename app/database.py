@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -14,3 +15,24 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def prewarm_pool(count: int) -> int:
+    """Open up to ``count`` pooled connections now so early requests skip the connect handshake."""
+    size = getattr(engine.pool, "size", None)
+    if callable(size):
+        # Connections beyond the pool size would be discarded on return
+        count = min(count, size())
+    if count <= 0:
+        return 0
+
+    def checkout(_):
+        conn = engine.connect()
+        conn.exec_driver_sql("SELECT 1")
+        return conn
+
+    # Check out all at once (not one by one) so each is a distinct connection
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        connections = list(pool.map(checkout, range(count)))
+    for conn in connections:
+        conn.close()
+    return len(connections)
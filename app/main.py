@@ -1,24 +1,83 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, contextmanager
+import asyncio
+import logging
 import os
+import re
+import time
 
 from .config import settings
-from .core.firebase import initialize_firebase
-from .database import engine, Base
-from .api import notices, users, auth
+from .core.firebase import firebase_configured, initialize_firebase
+from .core.scheduler import notice_scheduler
+from .core.audit import audit_log
+from .core.suggest import suggest_index
+from .core.hotset import hot_set
+from .core.storage import UploadLimitMiddleware
+from .core.tracing import TracingMiddleware, tracer
+from .core.webhooks import webhook_dispatcher
+from .database import engine, Base, prewarm_pool
+from .api import notices, users, auth, attachments, audit, admin, webhooks
 
 
 
+logger = logging.getLogger(__name__)
+
+# Milliseconds spent in each startup step, reported by /metrics
+startup_timings = {}
+
+@contextmanager
+def _startup_step(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    initialize_firebase()
-    Base.metadata.create_all(bind=engine)
+    production = settings.STARTUP_MODE == "production"
+    startup_timings.clear()
+    started = time.perf_counter()
+    with _startup_step("tracing"):
+        tracer.start()
+    if production:
+        # Firebase initializes on the first authenticated request instead
+        if not firebase_configured():
+            logger.warning("Firebase credentials not configured; authenticated requests will fail")
+    else:
+        with _startup_step("firebase"):
+            initialize_firebase()
+        with _startup_step("schema"):
+            Base.metadata.create_all(bind=engine)
+    if settings.DB_POOL_PREWARM:
+        with _startup_step("db_pool"):
+            await asyncio.to_thread(prewarm_pool, settings.DB_POOL_PREWARM)
+    with _startup_step("scheduler"):
+        await notice_scheduler.start()
+    with _startup_step("audit"):
+        await audit_log.start()
+    with _startup_step("webhooks"):
+        await webhook_dispatcher.start()
+    with _startup_step("suggest_index"):
+        await suggest_index.start(build_now=settings.PREWARM_CACHES)
+    with _startup_step("hot_set"):
+        await hot_set.start(build_now=settings.PREWARM_CACHES)
+    startup_timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(
+        "Started in %s mode in %.1f ms (%s)", settings.STARTUP_MODE, startup_timings["total"],
+        ", ".join(f"{step}={ms}ms" for step, ms in startup_timings.items() if step != "total")
+    )
     yield
     # Shutdown
-    pass
+    await notice_scheduler.stop()
+    await suggest_index.stop()
+    await hot_set.stop()
+    await audit_log.stop()
+    await webhook_dispatcher.stop()
+    tracer.stop()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -40,6 +99,14 @@ production_url = "https://code-for-campus-fe-production.up.railway.app"
 if production_url not in origins:
     origins.append(production_url)
 
+# Oversized uploads are refused before the multipart body is spooled; added
+# before CORS so the 413 still carries CORS headers
+app.add_middleware(
+    UploadLimitMiddleware,
+    path=re.compile(rf"^{re.escape(settings.API_V1_STR)}/notices/\d+/attachments/?$"),
+    max_size=settings.MAX_ATTACHMENT_SIZE,
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -51,8 +118,12 @@ app.add_middleware(
 
 # Include routers
 app.include_router(notices.router, prefix=f"{settings.API_V1_STR}/notices", tags=["notices"])
+app.include_router(attachments.router, prefix=f"{settings.API_V1_STR}/notices", tags=["attachments"])
 app.include_router(users.router, prefix=f"{settings.API_V1_STR}/users", tags=["users"])
 app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
+app.include_router(audit.router, prefix=f"{settings.API_V1_STR}/audit", tags=["audit"])
+app.include_router(webhooks.router, prefix=f"{settings.API_V1_STR}/webhooks", tags=["webhooks"])
+app.include_router(admin.router, prefix=settings.API_V1_STR)
 
 
 @app.get("/")
@@ -63,6 +134,26 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics")
+async def metrics():
+    return {
+        "singleflight": {
+            flight.name: {**flight.stats, "in_flight": flight.in_flight}
+            for flight in (notices.notice_page_flight, notices.feed_token_flight, notices.subcategory_flight)
+        },
+        "audit": audit_log.stats,
+        "hot_set": hot_set.stats,
+        "webhooks": webhook_dispatcher.stats,
+        "tracing": {**tracer.stats, "sample_rate": tracer.sample_rate},
+        "startup_ms": startup_timings,
+    }
+
+# Instrument once every route is registered. Added last, the tracing middleware
+# is outermost, so the request span covers CORS and routing too
+tracer.instrument_routes(app)
+tracer.instrument_engine(engine)
+app.add_middleware(TracingMiddleware, tracer=tracer)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
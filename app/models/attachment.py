@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from ..database import Base
+
+class NoticeAttachment(Base):
+    __tablename__ = "notice_attachments"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    notice_id = Column(Integer, ForeignKey("notices.id", ondelete="CASCADE"), nullable=False, index=True)
+    sha256 = Column(String(64), nullable=False, index=True)  # blob key in attachment storage
+    filename = Column(String(255), nullable=False)
+    content_type = Column(String(100), nullable=False)
+    size = Column(BigInteger, nullable=False)
+    uploaded_by = Column(String(128), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class AttachmentBlob(Base):
+    """One row per stored blob; its row lock serialises dedup reuse against GC."""
+    __tablename__ = "attachment_blobs"
+    
+    sha256 = Column(String(64), primary_key=True)
+    ref_count = Column(Integer, nullable=False, default=0)  # attachment rows pointing at the blob
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
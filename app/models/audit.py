@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from ..database import Base
+
+class AuditEvent(Base):
+    __tablename__ = "audit_log"
+    __table_args__ = (
+        # Listings are per campus and page by id, so every index is (campus, x, id)
+        Index("ix_audit_log_campus_id", "campus", "id"),
+        Index("ix_audit_log_campus_actor_id", "campus", "actor_uid", "id"),
+        Index("ix_audit_log_campus_action_id", "campus", "action", "id"),
+        Index("ix_audit_log_campus_target_id", "campus", "target_type", "target_id", "id"),
+        Index("ix_audit_log_campus_created_at", "campus", "created_at"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    campus = Column(String(50), nullable=False)
+    actor_uid = Column(String(128), nullable=False)
+    action = Column(String(50), nullable=False)  # e.g. notice.create, user.role_change
+    target_type = Column(String(50), nullable=False)  # notice, user
+    target_id = Column(String(128), nullable=False)
+    details = Column(Text, nullable=True)  # JSON
+    created_at = Column(DateTime(timezone=True), nullable=False)  # when the action happened, not when it was flushed
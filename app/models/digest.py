@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from ..database import Base
+
+class DigestWatermark(Base):
+    """How far each department's digest has got, so a run only reads newer notices."""
+    __tablename__ = "digest_watermarks"
+    
+    campus = Column(String(50), primary_key=True)
+    department = Column(String(100), primary_key=True)  # "" for users without a department
+    watermark = Column(DateTime(timezone=True), nullable=False)  # notices visible up to here were sent
+    last_run_at = Column(DateTime(timezone=True), nullable=True)
+    last_notice_count = Column(Integer, nullable=False, default=0)
+    last_recipient_count = Column(Integer, nullable=False, default=0)
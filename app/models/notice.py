@@ -1,19 +1,52 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Index, text
 from sqlalchemy.sql import func
+from ..config import settings
 from ..database import Base
+from ..utils.helpers import as_utc
 
 class Notice(Base):
     __tablename__ = "notices"
+    __table_args__ = (
+        # Every hot path is scoped to one campus, so the campus leads each index
+        # and a large campus never widens the scans of a small one
+        Index("ix_notices_campus_feed", "campus", "category", "priority", "created_at"),
+        Index("ix_notices_campus_subcategory", "campus", "subcategory"),
+        # Moderation queue: only pending rows are indexed, in queue order
+        Index(
+            "ix_notices_campus_pending", "campus", "created_at", "id",
+            postgresql_where=text("is_approved IS NULL"),
+            sqlite_where=text("is_approved IS NULL"),
+        ),
+        # Digest runs read notices approved since their watermark
+        Index("ix_notices_campus_approved_at", "campus", "approved_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
+    campus = Column(String(50), nullable=False, default=settings.DEFAULT_CAMPUS, server_default=settings.DEFAULT_CAMPUS)
     title = Column(String(255), nullable=False, index=True)
     content = Column(Text, nullable=False)
-    category = Column(String(50), nullable=False, index=True)  # main, club, department
-    subcategory = Column(String(100), index=True)  # specific club/department name
+    category = Column(String(50), nullable=False)  # main, club, department
+    subcategory = Column(String(100))  # specific club/department name
     author_uid = Column(String(128), nullable=False)
     author_name = Column(String(255), nullable=False)
     is_active = Column(Boolean, default=True)
+    is_approved = Column(Boolean, nullable=True, default=True, server_default="true")  # None = pending review, False = rejected
+    approved_by = Column(String(128), nullable=True)
+    approved_at = Column(DateTime(timezone=True), nullable=True)
+    rejection_reason = Column(Text, nullable=True)
+    is_published = Column(Boolean, nullable=False, default=True, server_default="true", index=True)  # flipped by the scheduler
     priority = Column(Integer, default=0)  # Higher number = higher priority
+    revision = Column(Integer, nullable=False, default=1, server_default="1")  # bumped on every edit
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    publish_at = Column(DateTime(timezone=True), nullable=True, index=True)
     expires_at = Column(DateTime(timezone=True), nullable=True)
+
+    def is_expired(self, now) -> bool:
+        expires_at = as_utc(self.expires_at)
+        return expires_at is not None and expires_at <= now
+
+    def is_visible(self, now) -> bool:
+        """Whether the notice belongs on the public board at ``now`` (aware UTC)."""
+        return (bool(self.is_active) and bool(self.is_approved) and bool(self.is_published)
+                and not self.is_expired(now))
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from ..database import Base
+
+class NoticeRevision(Base):
+    __tablename__ = "notice_revisions"
+    __table_args__ = (UniqueConstraint("notice_id", "revision", name="uq_notice_revisions_notice_revision"),)
+    
+    id = Column(Integer, primary_key=True)
+    notice_id = Column(Integer, ForeignKey("notices.id", ondelete="CASCADE"), nullable=False)
+    revision = Column(Integer, nullable=False)
+    is_snapshot = Column(Boolean, nullable=False, default=False)  # full copy, otherwise a reverse delta
+    data = Column(Text, nullable=False)
+    superseded_by = Column(String(128), nullable=False)  # uid of the editor who replaced this version
+    superseded_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,11 +1,16 @@
-from sqlalchemy import Column, String, Boolean, DateTime
+from sqlalchemy import Column, String, Boolean, DateTime, Index
 from sqlalchemy.sql import func
+from ..config import settings
 from ..database import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_campus_department", "campus", "department"),
+    )
     
     uid = Column(String(128), primary_key=True)
+    campus = Column(String(50), nullable=False, default=settings.DEFAULT_CAMPUS, server_default=settings.DEFAULT_CAMPUS)
     email = Column(String(255), unique=True, index=True, nullable=False)
     name = Column(String(255), nullable=False)
     role = Column(String(50), default="student")  # admin, student, faculty
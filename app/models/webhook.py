@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index, text
+from sqlalchemy.sql import func
+from ..database import Base
+
+class WebhookSubscription(Base):
+    __tablename__ = "webhook_subscriptions"
+    
+    id = Column(Integer, primary_key=True)
+    campus = Column(String(50), nullable=False, index=True)
+    url = Column(String(2048), nullable=False)
+    secret = Column(String(128), nullable=False)  # HMAC key for the signature header
+    events = Column(Text, nullable=False)  # comma-separated, e.g. notice.created,notice.deleted
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_by = Column(String(128), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_delivery_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+
+class WebhookDelivery(Base):
+    """One event waiting to reach one subscriber; rows are deleted once delivered."""
+    __tablename__ = "webhook_deliveries"
+    __table_args__ = (
+        # Delivered-or-dead rows have no next attempt and stay out of the index
+        Index(
+            "ix_webhook_deliveries_due", "next_attempt_at",
+            postgresql_where=text("next_attempt_at IS NOT NULL"),
+            sqlite_where=text("next_attempt_at IS NOT NULL"),
+        ),
+        Index("ix_webhook_deliveries_subscription", "subscription_id", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    subscription_id = Column(Integer, ForeignKey("webhook_subscriptions.id", ondelete="CASCADE"), nullable=False)
+    event = Column(String(50), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)  # NULL once retries are exhausted
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+class Attachment(BaseModel):
+    id: int
+    notice_id: int
+    filename: str
+    content_type: str
+    size: int
+    sha256: str
+    created_at: datetime
+    class Config:
+        from_attributes = True
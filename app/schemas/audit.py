@@ -0,0 +1,26 @@
+from pydantic import BaseModel, field_validator
+from typing import Any, Optional
+from datetime import datetime
+import json
+
+class AuditEvent(BaseModel):
+    id: int
+    campus: str
+    actor_uid: str
+    action: str
+    target_type: str
+    target_id: str
+    details: Optional[Any] = None
+    created_at: datetime
+    
+    @field_validator("details", mode="before")
+    @classmethod
+    def decode_details(cls, value):
+        return json.loads(value) if isinstance(value, str) else value
+    
+    class Config:
+        from_attributes = True
+
+class AuditEventPage(BaseModel):
+    events: list[AuditEvent]
+    next_cursor: Optional[int] = None
@@ -8,6 +8,7 @@ class NoticeBase(BaseModel):
     category: str = Field(..., pattern="^(main|club|department)$")
     subcategory: Optional[str] = Field(None, max_length=100)
     priority: Optional[int] = Field(0, ge=0, le=10)
+    publish_at: Optional[datetime] = None
     expires_at: Optional[datetime] = None
 
 class NoticeCreate(NoticeBase):
@@ -20,13 +21,21 @@ class NoticeUpdate(BaseModel):
     subcategory: Optional[str] = Field(None, max_length=100)
     priority: Optional[int] = Field(None, ge=0, le=10)
     is_active: Optional[bool] = None
+    publish_at: Optional[datetime] = None
     expires_at: Optional[datetime] = None
 
 class Notice(BaseModel):
     id: int
+    campus: str
     author_uid: str
     author_name: str
     is_active: bool
+    is_published: bool
+    is_approved: Optional[bool]
+    approved_by: Optional[str]
+    approved_at: Optional[datetime]
+    rejection_reason: Optional[str]
+    revision: int
     created_at: datetime
     updated_at: Optional[datetime]
     # Inherit NoticeBase fields
@@ -35,10 +44,59 @@ class Notice(BaseModel):
     category: str
     subcategory: Optional[str]
     priority: Optional[int]
+    publish_at: Optional[datetime]
     expires_at: Optional[datetime]
     class Config:
         from_attributes = True
 
+class NoticeRevisionInfo(BaseModel):
+    revision: int
+    is_current: bool
+    is_snapshot: bool
+    stored_bytes: int
+    superseded_by: Optional[str] = None
+    superseded_at: Optional[datetime] = None
+
+class NoticeRevision(BaseModel):
+    notice_id: int
+    revision: int
+    title: str
+    content: str
+    category: str
+    subcategory: Optional[str]
+    priority: Optional[int]
+    is_active: Optional[bool]
+    publish_at: Optional[datetime]
+    expires_at: Optional[datetime]
+
+class NoticeSuggestion(BaseModel):
+    text: str
+    kind: str  # title or subcategory
+    notice_id: Optional[int] = None
+    category: str
+
+class NoticeBatchRequest(BaseModel):
+    ids: list[int] = Field(..., min_length=1)
+
+class NoticeBatch(BaseModel):
+    notices: list[Notice]
+    missing: list[int]
+
+class ModerationRequest(BaseModel):
+    notice_ids: list[int] = Field(..., min_length=1, max_length=500)
+
+class RejectionRequest(ModerationRequest):
+    reason: str = Field(..., min_length=1, max_length=1000)
+
+class ModerationResult(BaseModel):
+    message: str
+    updated_ids: list[int]
+    total_requested: int
+
+class PendingNoticePage(BaseModel):
+    notices: list[Notice]
+    next_cursor: Optional[str] = None
+
 class NoticeList(BaseModel):
     notices: list[Notice]
     total: int
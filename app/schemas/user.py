@@ -10,6 +10,7 @@ class UserBase(BaseModel):
 
 class UserCreate(UserBase):
     uid: str
+    campus: Optional[str] = None
 
 class UserUpdate(BaseModel):
     name: Optional[str] = None
@@ -19,6 +20,7 @@ class UserUpdate(BaseModel):
 
 class User(UserBase):
     uid: str
+    campus: str
     is_active: bool
     created_at: datetime
     last_login: Optional[datetime]
@@ -0,0 +1,42 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Literal, Optional
+from datetime import datetime
+
+# Board-level events: created = appeared on the public board, updated = a
+# visible notice changed, deleted = left the board (deleted, hidden or expired)
+WebhookEvent = Literal["notice.created", "notice.updated", "notice.deleted"]
+ALL_EVENTS = ["notice.created", "notice.updated", "notice.deleted"]
+
+class WebhookSubscriptionCreate(BaseModel):
+    url: str = Field(..., max_length=2048, pattern="^https?://")
+    events: List[WebhookEvent] = Field(default_factory=lambda: list(ALL_EVENTS), min_length=1)
+
+class WebhookSubscriptionUpdate(BaseModel):
+    url: Optional[str] = Field(None, max_length=2048, pattern="^https?://")
+    events: Optional[List[WebhookEvent]] = Field(None, min_length=1)
+    is_active: Optional[bool] = None
+
+class WebhookSubscription(BaseModel):
+    id: int
+    campus: str
+    url: str
+    events: List[str]
+    is_active: bool
+    created_by: str
+    created_at: datetime
+    last_delivery_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    pending_deliveries: int = 0
+    dead_deliveries: int = 0  # gave up after WEBHOOK_MAX_ATTEMPTS
+
+    @field_validator("events", mode="before")
+    @classmethod
+    def split_events(cls, value):
+        return value.split(",") if isinstance(value, str) else value
+
+    class Config:
+        from_attributes = True
+
+class WebhookSubscriptionCreated(WebhookSubscription):
+    # Only returned once, when the subscription is created
+    secret: str
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Revision Storage Benchmark for Virtual Notice Board
+
+Simulates a long edit history on a large notice and reports, for several
+snapshot intervals, how much revision storage grows compared to keeping a full
+copy per edit, and how long it takes to rebuild any revision.
+Runs entirely in memory, no database needed.
+
+Usage: python app/scripts/benchmark_revisions.py [edits] [content_lines]
+"""
+import random
+import sys
+import os
+import time
+from types import SimpleNamespace
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.core.revisions import build_revision, chain_bounds, encode, reconstruct, snapshot_of
+
+WORDS = "exam schedule hall ticket semester lab timetable hostel library fee deadline seminar".split()
+
+def random_line(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 14))) + "\n"
+
+def make_notice(rng: random.Random, lines: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        title="End semester examination timetable",
+        content="".join(random_line(rng) for _ in range(lines)),
+        category="main",
+        subcategory="examinations",
+        priority=5,
+        is_active=True,
+        publish_at=None,
+        expires_at=None,
+    )
+
+def edit(notice: SimpleNamespace, rng: random.Random) -> None:
+    """Typical edit: touch a few lines, sometimes insert/remove one or bump priority."""
+    lines = notice.content.splitlines(keepends=True)
+    for _ in range(rng.randint(1, 3)):
+        lines[rng.randrange(len(lines))] = random_line(rng)
+    roll = rng.random()
+    if roll < 0.2:
+        lines.insert(rng.randrange(len(lines)), random_line(rng))
+    elif roll < 0.3 and len(lines) > 1:
+        del lines[rng.randrange(len(lines))]
+    if rng.random() < 0.1:
+        notice.priority = rng.randint(0, 10)
+    notice.content = "".join(lines)
+
+def run(edits: int, content_lines: int, interval: int) -> dict:
+    rng = random.Random(42)
+    notice = make_notice(rng, content_lines)
+    history = [snapshot_of(notice)]
+    stored = []
+    full_copy_bytes = 0
+
+    for revision in range(1, edits + 1):
+        before = snapshot_of(notice)
+        edit(notice, rng)
+        after = snapshot_of(notice)
+        is_snapshot, data = build_revision(before, after, revision, interval)
+        stored.append((revision, is_snapshot, data))
+        full_copy_bytes += len(encode(before).encode("utf-8"))
+        history.append(after)
+
+    current_revision = edits + 1
+    current = history[-1]
+    timings = []
+    for target in range(1, current_revision):
+        low, high = chain_bounds(target, current_revision, interval)
+        rows = stored[low - 1:high]
+        start = time.perf_counter()
+        version = reconstruct(current, current_revision, rows, target)
+        timings.append(time.perf_counter() - start)
+        assert version == history[target - 1], f"revision {target} rebuilt incorrectly"
+
+    timings.sort()
+    delta_bytes = sum(len(data.encode("utf-8")) for _, _, data in stored)
+    return {
+        "interval": interval,
+        "stored_kb": delta_bytes / 1024,
+        "full_kb": full_copy_bytes / 1024,
+        "ratio": delta_bytes / full_copy_bytes,
+        "p50_ms": timings[len(timings) // 2] * 1000,
+        "max_ms": timings[-1] * 1000,
+    }
+
+def main():
+    edits = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    content_lines = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+
+    print(f"{edits} edits on a {content_lines}-line notice")
+    print(f"{'interval':>8} {'stored KB':>10} {'full KB':>10} {'ratio':>7} {'p50 ms':>8} {'max ms':>8}")
+    for interval in (5, 10, 20, 50):
+        result = run(edits, content_lines, interval)
+        print(
+            f"{result['interval']:>8} {result['stored_kb']:>10.1f} {result['full_kb']:>10.1f} "
+            f"{result['ratio']:>7.3f} {result['p50_ms']:>8.3f} {result['max_ms']:>8.3f}"
+        )
+
+if __name__ == "__main__":
+    main()
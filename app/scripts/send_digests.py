@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Department Digest Job for Virtual Notice Board
+
+Emails every department the notices that went up since its previous digest.
+Meant to run from cron (or a Railway cron service) once or twice a day; each
+run only reads notices newer than the stored watermarks. With the default
+MAIL_SENDER=outbox, messages land in the MAIL_OUTBOX_DIR Maildir.
+
+Usage: python app/scripts/send_digests.py [campus ...]
+"""
+import logging
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.config import settings
+from app.core.digest import DigestJob
+from app.database import engine
+from app.models.digest import DigestWatermark
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if settings.STARTUP_MODE != "production":
+        # Alembic owns the schema in production; locally, create the table on demand
+        DigestWatermark.__table__.create(bind=engine, checkfirst=True)
+
+    campuses = sys.argv[1:] or None
+    stats = DigestJob().run(campuses=campuses)
+    print(
+        f"Sent {stats['messages']} messages to {stats['recipients']} members "
+        f"across {stats['departments']} departments ({stats['notices']} notice entries, "
+        f"{stats['campuses']} campuses)"
+    )
+
+if __name__ == "__main__":
+    main()
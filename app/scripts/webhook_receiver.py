@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Local Webhook Receiver for Virtual Notice Board
+
+A stand-in subscriber for trying webhooks without a real signage or mobile
+backend. Prints every delivered event, checks the signature when a secret is
+given, and can act slow or flaky to exercise batching and retries.
+
+Usage: python app/scripts/webhook_receiver.py [port] [secret] [fail_rate] [delay_seconds]
+Then subscribe it with POST /api/v1/webhooks/ {"url": "http://localhost:<port>/"}
+"""
+import json
+import random
+import sys
+import os
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.core.webhooks import SIGNATURE_HEADER, verify_signature
+
+def make_handler(secret, fail_rate: float, delay: float):
+    class WebhookHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is visible
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if delay:
+                time.sleep(delay)
+            if secret and not verify_signature(secret, self.headers.get(SIGNATURE_HEADER, ""), body):
+                print("Rejected batch: bad signature")
+                return self._reply(401)
+            if random.random() < fail_rate:
+                print("Failing batch on purpose")
+                return self._reply(503)
+
+            events = json.loads(body)["events"]
+            print(f"Received {len(events)} events on {self.client_address[0]}:{self.client_address[1]}")
+            for event in events:
+                data = event["data"]
+                print(f"  #{event['id']} {event['event']} notice {data.get('id')} {data.get('title', '')!r}")
+            self._reply(204)
+
+        def _reply(self, status: int):
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    return WebhookHandler
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8081
+    secret = sys.argv[2] if len(sys.argv) > 2 else None
+    fail_rate = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+    delay = float(sys.argv[4]) if len(sys.argv) > 4 else 0.0
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(secret, fail_rate, delay))
+    print(f"Listening on http://127.0.0.1:{port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
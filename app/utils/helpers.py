@@ -1 +1,63 @@
 # Utility/helper functions can be added here as needed
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+
+def utcnow() -> datetime:
+    """Timezone-aware current UTC time, comparable with the DateTime(timezone=True) columns."""
+    return datetime.now(timezone.utc)
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Normalize a datetime to aware UTC. Naive values are assumed to already be UTC."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def http_date(value: datetime) -> str:
+    """Format a datetime for Last-Modified style headers."""
+    return format_datetime(as_utc(value), usegmt=True)
+
+
+def parse_http_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return as_utc(parsedate_to_datetime(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against ``etag`` (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def is_not_modified(headers, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Whether a conditional GET can be answered with 304.
+
+    If-None-Match wins when present; If-Modified-Since is only consulted without
+    it, at the one-second resolution HTTP dates carry.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    since = parse_http_date(headers.get("if-modified-since"))
+    if since is None or last_modified is None:
+        return False
+    return as_utc(last_modified).replace(microsecond=0) <= since